@@ -0,0 +1,251 @@
+# ============================================
+# backend/_indicator_kernels.py
+# JIT-compiled indicator kernels (float64 arrays in, scalars out)
+# ============================================
+import numpy as np
+
+from _njit import njit
+
+@njit(cache=True, fastmath=True, nogil=True)
+def ema_full(a, period):
+    """Full EMA series (span smoothing, seeded on the first value)"""
+    alpha = 2.0 / (period + 1.0)
+    out = np.empty_like(a)
+    out[0] = a[0]
+    for i in range(1, a.shape[0]):
+        out[i] = alpha * a[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+@njit(cache=True, fastmath=True, nogil=True)
+def rsi_last(close, period):
+    """Latest Wilder RSI"""
+    n = close.shape[0]
+    if n <= period:
+        return np.nan
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            avg_gain += delta
+        else:
+            avg_loss -= delta
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period + 1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+
+    if avg_loss == 0:
+        return 100.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+@njit(cache=True, fastmath=True, nogil=True)
+def adx_last(high, low, close, period):
+    """Latest Wilder ADX with the final +DI/-DI pair"""
+    n = close.shape[0]
+    if n < 2 * period:
+        return np.nan, 0.0, 0.0
+
+    # Seed the smoothed TR and directional movement averages
+    atr = 0.0
+    plus = 0.0
+    minus = 0.0
+    for i in range(1, period + 1):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        atr += max(hl, hc, lc)
+        up = high[i] - high[i - 1]
+        dn = low[i - 1] - low[i]
+        if up > dn and up > 0:
+            plus += up
+        elif dn > up and dn > 0:
+            minus += dn
+    atr /= period
+    plus /= period
+    minus /= period
+
+    adx = 0.0
+    dx_count = 0
+    dip = 0.0
+    dim = 0.0
+    for i in range(period + 1, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = max(hl, hc, lc)
+        atr = (atr * (period - 1) + tr) / period
+
+        up = high[i] - high[i - 1]
+        dn = low[i - 1] - low[i]
+        p = up if (up > dn and up > 0) else 0.0
+        m = dn if (dn > up and dn > 0) else 0.0
+        plus = (plus * (period - 1) + p) / period
+        minus = (minus * (period - 1) + m) / period
+
+        if atr > 0:
+            dip = 100.0 * plus / atr
+            dim = 100.0 * minus / atr
+        else:
+            dip = 0.0
+            dim = 0.0
+        di_sum = dip + dim
+        dx = 100.0 * abs(dip - dim) / di_sum if di_sum > 0 else 0.0
+
+        # ADX seeds on a simple mean of the first `period` DX values,
+        # then Wilder-smooths like everything else
+        if dx_count < period:
+            adx += dx
+            dx_count += 1
+            if dx_count == period:
+                adx /= period
+        else:
+            adx = (adx * (period - 1) + dx) / period
+
+    if dx_count < period:
+        return np.nan, dip, dim
+    return adx, dip, dim
+
+@njit(cache=True, fastmath=True, nogil=True)
+def atr_last(high, low, close, period):
+    """Latest Wilder ATR plus the mean of the last 20 ATR values"""
+    n = close.shape[0]
+    if n <= period:
+        return 0.0, 0.0
+
+    atr = 0.0
+    for i in range(1, period + 1):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        atr += max(hl, hc, lc)
+    atr /= period
+
+    # Ring buffer of the trailing 20 ATR values for the volatility filter
+    ring = np.empty(20)
+    ring[0] = atr
+    count = 1
+    idx = 1
+    for i in range(period + 1, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = max(hl, hc, lc)
+        atr = (atr * (period - 1) + tr) / period
+        ring[idx] = atr
+        idx = (idx + 1) % 20
+        if count < 20:
+            count += 1
+
+    avg20 = 0.0
+    for i in range(count):
+        avg20 += ring[i]
+    avg20 /= count
+
+    return atr, avg20
+
+@njit(cache=True, fastmath=True, nogil=True)
+def macd_hist_last(close):
+    """Latest MACD(12, 26, 9) histogram value"""
+    macd_line = ema_full(close, 12) - ema_full(close, 26)
+    signal_line = ema_full(macd_line, 9)
+    return macd_line[-1] - signal_line[-1]
+
+@njit(cache=True, fastmath=True, nogil=True)
+def supertrend_dir_last(high, low, close, period, multiplier):
+    """Latest Supertrend direction: 1 for uptrend, -1 for downtrend"""
+    n = close.shape[0]
+
+    # Wilder ATR over the true range
+    atr = 0.0
+    for i in range(1, period + 1):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = max(hl, hc, lc)
+        atr += tr
+    atr /= period
+
+    hl2 = (high[period] + low[period]) / 2.0
+    final_upper = hl2 + multiplier * atr
+    final_lower = hl2 - multiplier * atr
+    direction = 1
+
+    for i in range(period + 1, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = max(hl, hc, lc)
+        atr = (atr * (period - 1) + tr) / period
+
+        hl2 = (high[i] + low[i]) / 2.0
+        upper = hl2 + multiplier * atr
+        lower = hl2 - multiplier * atr
+
+        if close[i] > final_upper:
+            direction = 1
+        elif close[i] < final_lower:
+            direction = -1
+
+        if upper < final_upper or close[i - 1] > final_upper:
+            final_upper = upper
+        if lower > final_lower or close[i - 1] < final_lower:
+            final_lower = lower
+
+    return direction
+
+@njit(cache=True, fastmath=True, nogil=True)
+def pivot_sr(high, low, close, lookback):
+    """Pivot-point support/resistance over the trailing lookback window"""
+    n = close.shape[0]
+    start = n - lookback if n > lookback else 0
+
+    recent_high = high[start]
+    recent_low = low[start]
+    for i in range(start + 1, n):
+        if high[i] > recent_high:
+            recent_high = high[i]
+        if low[i] < recent_low:
+            recent_low = low[i]
+
+    current_price = close[-1]
+    pivot = (recent_high + recent_low + current_price) / 3.0
+
+    resistance1 = (2.0 * pivot) - recent_low
+    resistance2 = pivot + (recent_high - recent_low)
+    support1 = (2.0 * pivot) - recent_high
+    support2 = pivot - (recent_high - recent_low)
+
+    resistance = resistance1 if resistance1 > current_price else resistance2
+    support = support1 if support1 < current_price else support2
+
+    return support, resistance
+
+def warmup():
+    """Compile every kernel on tiny synthetic data before trading starts
+
+    The first call into an njit kernel pays the JIT compile (tens of
+    seconds across all kernels); with cache=True the artifacts persist
+    under __pycache__, so on later starts this is just a disk load.
+    """
+    from _njit import sma_full, sma_last
+
+    close = np.linspace(100.0, 110.0, 60)
+    high = close + 1.0
+    low = close - 1.0
+
+    ema_full(close, 9)
+    rsi_last(close, 14)
+    adx_last(high, low, close, 14)
+    atr_last(high, low, close, 14)
+    macd_hist_last(close)
+    supertrend_dir_last(high, low, close, 7, 3.0)
+    pivot_sr(high, low, close, 20)
+    sma_last(close, 9)
+    sma_full(close, 9)
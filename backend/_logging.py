@@ -0,0 +1,25 @@
+# ============================================
+# backend/_logging.py
+# Shared logging setup
+# ============================================
+import logging
+import os
+
+# Banner rule reused by the modules that log section headers
+RULE = '=' * 60
+
+def configure():
+    """
+    Configure root logging once. Output stays message-only so the
+    console looks the same as the old print() statements; set
+    PYREACT_LOG_LEVEL=WARNING in production to silence the chatter.
+    """
+    level = os.environ.get('PYREACT_LOG_LEVEL', 'INFO').upper()
+    logging.basicConfig(
+        level=getattr(logging, level, logging.INFO),
+        format='%(message)s'
+    )
+
+def get_logger(name):
+    """Module logger; use lazy %s formatting, not f-strings"""
+    return logging.getLogger(name)
@@ -0,0 +1,50 @@
+# ============================================
+# backend/_njit.py
+# Optional Numba shim + small numeric kernels
+# ============================================
+import numpy as np
+
+# Numba is optional - without it the kernels run as plain Python,
+# which is still correct, just slower
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op decorator standing in for numba.njit"""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+        return wrap
+
+@njit(cache=True, fastmath=True, nogil=True)
+def sma_last(a, period):
+    """Simple moving average of the trailing window only"""
+    n = a.shape[0]
+    if n < period:
+        return np.nan
+
+    s = 0.0
+    for i in range(n - period, n):
+        s += a[i]
+    return s / period
+
+@njit(cache=True, fastmath=True, nogil=True)
+def sma_full(a, period):
+    """Full SMA series via a running-sum sliding window (O(n))"""
+    n = a.shape[0]
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+
+    s = 0.0
+    for i in range(period):
+        s += a[i]
+    out[period - 1] = s / period
+
+    for i in range(period, n):
+        s += a[i] - a[i - period]
+        out[i] = s / period
+
+    return out
@@ -1,38 +1,151 @@
-from flask import jsonify, request
+import gzip
+import hashlib
+import time
 from datetime import datetime
 
-def register_routes(app, settings, position_manager):
+from flask import jsonify, request, Response
+
+from db_manager import get_candles_columnar, get_latest_score, get_latest_scores_json
+
+# orjson serializes the numeric payloads much faster than stdlib json
+# (and walks NumPy buffers directly instead of materializing floats)
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    import json
+
+    def _dumps(obj):
+        return json.dumps(obj, default=lambda o: o.tolist()).encode('utf-8')
+
+# Compress responses bigger than this when the client accepts gzip
+_GZIP_MIN_SIZE = 1024
+
+# /api/stats result cache: [timestamp, response_dict]
+_STATS_TTL = 2.0
+
+def _etag_response(payload_bytes, etag):
+    """Serve precomputed JSON bytes with ETag-based conditional GETs"""
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    return Response(
+        payload_bytes,
+        mimetype='application/json',
+        headers={'ETag': etag}
+    )
+
+def register_routes(app, settings, position_manager, background_worker):
     """Register all API routes"""
-    
+
+    # settings and symbols are immutable for the process lifetime -
+    # serialize them once and answer with the cached bytes
+    settings_bytes = _dumps(settings)
+    settings_etag = hashlib.md5(settings_bytes).hexdigest()
+    symbols_bytes = _dumps(settings['symbols'])
+    symbols_etag = hashlib.md5(symbols_bytes).hexdigest()
+
+    # [timestamp, serialized bytes]
+    stats_cache = [0.0, None]
+
+    # URL parameters are validated against the configured sets before
+    # any database access: an unknown symbol would otherwise create a
+    # stray db/<symbol>.sqlite via get_connection, and interval is
+    # interpolated into a table name
+    valid_symbols = frozenset(settings['symbols'])
+    valid_intervals = frozenset(settings['intervals'])
+
     @app.route('/api/symbols')
     def get_symbols():
-        return jsonify(settings['symbols'])
-    
+        return _etag_response(symbols_bytes, symbols_etag)
+
     @app.route('/api/settings')
     def get_settings():
-        return jsonify(settings)
-    
+        return _etag_response(settings_bytes, settings_etag)
+
+    @app.route('/api/scores/<symbol>')
+    def get_symbol_score(symbol):
+        if symbol not in valid_symbols:
+            return jsonify({'error': f'Unknown symbol {symbol}'}), 404
+        score = get_latest_score(symbol)
+        if score is None:
+            return jsonify({'error': f'No scores for {symbol}'}), 404
+        return jsonify(score)
+
+    @app.route('/api/scores/<symbol>/history')
+    def get_symbol_score_history(symbol):
+        if symbol not in valid_symbols:
+            return jsonify({'error': f'Unknown symbol {symbol}'}), 404
+        limit = int(request.args.get('limit', 100))
+        # The JSON array comes back pre-assembled from SQLite
+        return Response(
+            get_latest_scores_json(symbol, limit),
+            mimetype='application/json'
+        )
+
+    @app.route('/api/candles/<symbol>/<interval>')
+    def get_symbol_candles(symbol, interval):
+        if symbol not in valid_symbols:
+            return jsonify({'error': f'Unknown symbol {symbol}'}), 404
+        if interval not in valid_intervals:
+            return jsonify({'error': f'Unknown interval {interval}'}), 404
+        limit = int(request.args.get('limit', 100))
+        candles = get_candles_columnar(symbol, interval, limit)
+        if candles is None:
+            return jsonify({'error': f'No candles for {symbol} {interval}'}), 404
+        return Response(
+            _dumps({'symbol': symbol, 'interval': interval, 'candles': candles}),
+            mimetype='application/json'
+        )
+
     @app.route('/api/positions')
     def get_positions():
         positions = position_manager.get_open_positions()
-        return jsonify(positions)
-    
+        return Response(_dumps(positions), mimetype='application/json')
+
     @app.route('/api/trades')
     def get_trades():
         limit = int(request.args.get('limit', 20))
         trades = position_manager.get_recent_trades(limit)
-        return jsonify(trades)
-    
+        return Response(_dumps(trades), mimetype='application/json')
+
     @app.route('/api/stats')
     def get_stats():
-        stats = position_manager.get_trading_stats()
-        daily_pnl = position_manager.get_daily_pnl()
-        return jsonify({
-            'stats': stats,
-            'daily_pnl': daily_pnl,
-            'account_balance': settings.get('account_balance', 10000)
-        })
-    
+        now = time.monotonic()
+        if stats_cache[1] is None or now - stats_cache[0] > _STATS_TTL:
+            stats_cache[1] = _dumps({
+                'stats': position_manager.get_trading_stats(),
+                'daily_pnl': position_manager.get_daily_pnl(),
+                'account_balance': settings.get('account_balance', 10000)
+            })
+            stats_cache[0] = now
+        return Response(stats_cache[1], mimetype='application/json')
+
+    @app.route('/api/refresh', methods=['POST'])
+    def request_refresh():
+        # The handler only flips the worker's wake-up event, so the HTTP
+        # response returns immediately and concurrent requests coalesce
+        # into one cycle instead of duplicating every fetch and write
+        if background_worker.refresh_event.is_set():
+            return jsonify({'status': 'already_running'}), 409
+        background_worker.request_refresh()
+        return jsonify({'status': 'scheduled'}), 202
+
     @app.route('/api/health')
     def health_check():
         return jsonify({"status": "ok", "timestamp": datetime.now().isoformat()})
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code == 200
+                and not response.direct_passthrough
+                and 'Content-Encoding' not in response.headers
+                and 'gzip' in request.headers.get('Accept-Encoding', '')):
+            body = response.get_data()
+            if len(body) > _GZIP_MIN_SIZE:
+                response.set_data(gzip.compress(body, 5))
+                response.headers['Content-Encoding'] = 'gzip'
+                response.headers['Content-Length'] = str(len(response.get_data()))
+                response.headers.setdefault('Vary', 'Accept-Encoding')
+        return response
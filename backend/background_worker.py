@@ -1,55 +1,159 @@
+import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from data_fetcher import fetch_market_data_bulk, fetch_market_data_async
 from db_manager import get_latest_score
+from _logging import RULE, get_logger
+
+logger = get_logger(__name__)
+
+MAX_FETCH_WORKERS = 8
 
 class BackgroundWorker:
     """Background worker for continuous data updates"""
-    
+
     def __init__(self, settings, data_processor, signal_processor):
         self.settings = settings
         self.data_processor = data_processor
         self.signal_processor = signal_processor
+        # Set by an admin endpoint to wake the loop for an immediate
+        # cycle instead of waiting out the interval
+        self.refresh_event = threading.Event()
+        # Hour of the last ANALYZE run against the positions db
+        self._last_analyze_hour = -1
+
+    def request_refresh(self):
+        """Wake the worker loop for an immediate update cycle"""
+        self.refresh_event.set()
     
     def check_and_populate_initial_data(self):
         """Check if database is empty and populate"""
-        print(f"\n{'='*60}")
-        print("Checking for initial data load...")
-        print(f"{'='*60}")
-        
+        logger.info("\n%s\nChecking for initial data load...\n%s", RULE, RULE)
+
         for symbol in self.settings['symbols']:
             latest_score = get_latest_score(symbol)
             if latest_score is None:
-                print(f"  ⚠️  No scores for {symbol}. Loading initial data...")
+                logger.info("  ⚠️  No scores for %s. Loading initial data...", symbol)
                 self.data_processor.update_symbol_data(symbol, historical_limit=200)
             else:
-                print(f"  ✅ Existing scores found for {symbol}.")
-        
-        print(f"\n{'='*60}")
-        print("Initial data load complete.")
-        print(f"{'='*60}")
+                logger.info("  ✅ Existing scores found for %s.", symbol)
+
+        self.data_processor.flush_emits()
+
+        logger.info("\n%s\nInitial data load complete.\n%s", RULE, RULE)
     
+    def preload_market_data(self):
+        """Fetch all symbols per interval in one bulk request each"""
+        # Preferred path: overlap every (symbol, interval) request on a
+        # single asyncio event loop (requires aiohttp)
+        cache = fetch_market_data_async(
+            self.settings['symbols'],
+            self.settings['intervals'],
+            self.settings['candlesPerInterval']
+        )
+        if cache is not None:
+            self.data_processor.market_data_cache = cache
+            return
+
+        cache = {symbol: {} for symbol in self.settings['symbols']}
+
+        for interval, candles_needed, _ in self.settings['_interval_plan']:
+            bulk = fetch_market_data_bulk(
+                self.settings['symbols'], interval, candles_needed
+            )
+            for symbol, payload in bulk.items():
+                cache[symbol][interval] = payload
+
+        self.data_processor.market_data_cache = cache
+
+    def refresh_planner_stats(self):
+        """Run ANALYZE on the positions db at most once per hour"""
+        hour = time.localtime().tm_hour
+        if hour == self._last_analyze_hour:
+            return
+        self._last_analyze_hour = hour
+        try:
+            self.signal_processor.position_manager.analyze()
+        except Exception:
+            logger.exception("❌ ANALYZE failed")
+
     def run(self):
         """Main background worker loop"""
         self.check_and_populate_initial_data()
-        
+
+        update_interval = self.settings['updateIntervalMinutes'] * 60
+        backoff = 0
+        # Cycles start on a fixed monotonic deadline grid: a slow cycle
+        # shortens the following sleep instead of pushing every later
+        # cycle out by its overrun
+        next_deadline = time.monotonic() + update_interval
+
+        # PYREACT_PROFILE=1 profiles each cycle in place (see
+        # profile_hot.py for the one-shot harness)
+        profiling = os.environ.get('PYREACT_PROFILE') == '1'
+
         while True:
+            profiler = None
+            if profiling:
+                import cProfile
+                profiler = cProfile.Profile()
+                profiler.enable()
             try:
-                for symbol in self.settings['symbols']:
-                    master_score, weighted_indicators, interval_scores, current_price = \
-                        self.data_processor.update_symbol_data(symbol)
-                    
-                    if all([master_score, weighted_indicators, interval_scores, current_price]):
-                        self.signal_processor.process_trading_signals(
-                            symbol, master_score, weighted_indicators,
-                            interval_scores, current_price
-                        )
-                
-                print("\n✅ Background worker finished update cycle")
-            except Exception as e:
-                print(f"❌ Error in background worker: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            update_interval = self.settings['updateIntervalMinutes'] * 60
-            print(f"\n⏰ Sleeping for {self.settings['updateIntervalMinutes']} minutes...")
-            time.sleep(update_interval)
+                self.preload_market_data()
+
+                symbols = self.settings['symbols']
+                max_workers = min(len(symbols), MAX_FETCH_WORKERS)
+
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(self.data_processor.update_symbol_data, symbol): symbol
+                        for symbol in symbols
+                    }
+
+                    for future in as_completed(futures):
+                        symbol = futures[future]
+                        master_score, weighted_indicators, interval_scores, current_price = \
+                            future.result()
+
+                        if all([master_score, weighted_indicators, interval_scores, current_price]):
+                            self.signal_processor.process_trading_signals(
+                                symbol, master_score, weighted_indicators,
+                                interval_scores, current_price
+                            )
+
+                self.data_processor.flush_emits()
+
+                # Let queued candle/score writes land before sleeping
+                self.data_processor.flush_writes()
+
+                if profiler is not None:
+                    profiler.disable()
+                    import pstats
+                    pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+
+                self.refresh_planner_stats()
+
+                logger.info("\n✅ Background worker finished update cycle")
+                backoff = 0
+                now = time.monotonic()
+                # Step past any deadlines the cycle already overran
+                # rather than running catch-up cycles back to back
+                while next_deadline <= now:
+                    next_deadline += update_interval
+                sleep_for = next_deadline - now
+            except Exception:
+                logger.exception("❌ Error in background worker")
+                # Exponential backoff on failures, capped at the normal
+                # interval, so Yahoo throttles don't trigger retry storms
+                backoff = min(backoff * 2 or 5, update_interval)
+                sleep_for = backoff
+
+            # ±10% jitter avoids thundering-herd requests against Yahoo
+            sleep_for *= random.uniform(0.9, 1.1)
+            logger.info("\n⏰ Sleeping for %.0f seconds...", sleep_for)
+            if self.refresh_event.wait(timeout=sleep_for):
+                self.refresh_event.clear()
+                logger.info("⚡ Manual refresh requested - starting cycle now")
 
@@ -4,6 +4,63 @@
 import json
 import argparse
 import os
+import pickle
+from functools import lru_cache
+
+from _logging import RULE, get_logger
+
+logger = get_logger(__name__)
+
+# orjson parses the config several times faster than stdlib json;
+# fall back silently when it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+def _load_settings(config_file):
+    """Parse settings, using a pickled mtime-keyed cache when current"""
+    cache_file = config_file + '.cache'
+    mtime = os.stat(config_file).st_mtime
+
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_mtime, settings = pickle.load(f)
+        if cached_mtime == mtime:
+            return settings
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+    with open(config_file, 'rb') as f:
+        settings = _loads(f.read())
+
+    try:
+        with open(cache_file, 'wb') as f:
+            pickle.dump((mtime, settings), f)
+    except OSError:
+        pass  # Cache is best-effort only
+
+    return settings
+
+def finalize_settings(settings):
+    """
+    Materialize settings-derived lookup tables so hot loops don't
+    re-resolve dict defaults every cycle
+    """
+    intervals = settings['intervals']
+    candles = settings.get('candlesPerInterval', {})
+    stored = settings.get('maxCandlesStored', {})
+    weights = settings.get('timeframeWeights', {})
+
+    # (interval, candles_needed, max_candles) aligned to intervals
+    settings['_interval_plan'] = [
+        (iv, candles.get(iv, 100), stored.get(iv, 100)) for iv in intervals
+    ]
+    # Weights with defaults already resolved for every interval
+    settings['_timeframe_weights'] = {iv: weights.get(iv, 0.0) for iv in intervals}
+
+    return settings
 
 def load_configuration():
     """Load and validate configuration"""
@@ -17,85 +74,81 @@ def load_configuration():
     config_file = args.config
     account_balance = args.account_balance
     
-    print(f"\n{'='*60}")
-    print(f"📁 Loading configuration from: {config_file}")
-    print(f"{'='*60}")
-    
+    logger.info("\n%s\n📁 Loading configuration from: %s\n%s",
+                RULE, config_file, RULE)
+
     try:
-        with open(config_file, 'r') as f:
-            settings = json.load(f)
-        print(f"✅ Configuration loaded successfully!")
-        print(f"📊 Symbols: {', '.join(settings['symbols'])}")
-        print(f"💰 Account Balance: ${account_balance:,.2f}")
+        settings = finalize_settings(_load_settings(config_file))
+        logger.info("\n".join([
+            "✅ Configuration loaded successfully!",
+            f"📊 Symbols: {', '.join(settings['symbols'])}",
+            f"💰 Account Balance: ${account_balance:,.2f}"
+        ]))
         return settings, account_balance, config_file
     except FileNotFoundError:
-        print(f"❌ Error: Config file '{config_file}' not found!")
+        logger.error("❌ Error: Config file '%s' not found!", config_file)
         exit(1)
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON in config file: {e}")
+    except ValueError as e:
+        logger.error("❌ Error: Invalid JSON in config file: %s", e)
         exit(1)
 
+REQUIRED_PACKAGES = (
+    'flask', 'flask_socketio', 'flask_cors',
+    'yfinance', 'pandas', 'numpy', 'requests'
+)
+
+@lru_cache(maxsize=1)
 def check_dependencies():
     """Check if all required packages are installed"""
-    required_packages = [
-        'flask', 'flask_socketio', 'flask_cors', 
-        'yfinance', 'pandas', 'pandas_ta', 'numpy', 'requests'
-    ]
-    
-    missing = []
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing.append(package)
-    
+    # find_spec only checks availability - it doesn't execute module
+    # code, so heavyweight imports like pandas aren't paid here
+    from importlib.util import find_spec
+
+    missing = [p for p in REQUIRED_PACKAGES if find_spec(p) is None]
+
     if missing:
-        print(f"❌ Missing packages: {', '.join(missing)}")
-        print(f"💡 Install with: pip install {' '.join(missing)}")
+        logger.error("❌ Missing packages: %s", ', '.join(missing))
+        logger.error("💡 Install with: pip install %s", ' '.join(missing))
         return False
     
     return True
 
 def is_port_available(host, port):
-    """Check if port is available"""
+    """Check if port is available via a fast connect probe"""
     import socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    try:
-        sock.bind((host, port))
-        sock.close()
-        return True
-    except OSError:
-        return False
+    # A connect probe doesn't bind the port (no TIME_WAIT false
+    # positives and no race with Flask's own bind)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.05)
+        return sock.connect_ex(('127.0.0.1', port)) != 0
 
 def run_preflight_checks(config_file, settings):
     """Run all pre-flight checks"""
-    print("\n" + "="*60)
-    print("🔍 PRE-FLIGHT CHECKS")
-    print("="*60)
-    
+    logger.info("\n%s\n🔍 PRE-FLIGHT CHECKS\n%s", RULE, RULE)
+
     # Check dependencies
-    print("📦 Checking dependencies...")
+    logger.info("📦 Checking dependencies...")
     if not check_dependencies():
-        print("❌ Dependency check failed!")
+        logger.error("❌ Dependency check failed!")
         exit(1)
-    print("✅ All dependencies installed")
-    
-    # Check config file
-    print(f"📁 Checking config file: {config_file}")
-    if not os.path.exists(config_file):
-        print(f"❌ Config file not found: {config_file}")
+    logger.info("✅ All dependencies installed")
+
+    # Check config file (single open instead of a stat + open pair)
+    logger.info("📁 Checking config file: %s", config_file)
+    try:
+        open(config_file, 'rb').close()
+    except OSError:
+        logger.error("❌ Config file not found: %s", config_file)
         exit(1)
-    print("✅ Config file found")
-    
+    logger.info("✅ Config file found")
+
     # Check port availability
     api_port = settings['api_server']['port']
     if not is_port_available('0.0.0.0', api_port):
-        print(f"❌ Port {api_port} is already in use!")
-        print(f"💡 Stop the other process or change port in settings.json")
+        logger.error("❌ Port %s is already in use!", api_port)
+        logger.error("💡 Stop the other process or change port in settings.json")
         exit(1)
-    print(f"✅ Port {api_port} available")
-    
-    print("="*60)
-    print("✅ All pre-flight checks passed!")
-    print("="*60)
+    logger.info("✅ Port %s available", api_port)
+
+    logger.info("%s\n✅ All pre-flight checks passed!\n%s", RULE, RULE)
 
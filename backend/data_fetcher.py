@@ -2,10 +2,60 @@
 # backend/data_fetcher.py
 # Yahoo Finance Data Fetcher
 # ============================================
+import asyncio
+import time
+from dataclasses import dataclass
+
+import numpy as np
 import yfinance as yf
 import pandas as pd
 from datetime import datetime
 
+from _logging import get_logger
+
+logger = get_logger(__name__)
+
+# aiohttp is optional - when present the background worker overlaps all
+# chart requests on one event loop instead of going through yfinance
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+_CHART_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+# Reuse Ticker objects - each construction re-creates a session and
+# repeated .info access re-scrapes Yahoo
+_ticker_cache = {}
+
+# Short-lived (symbol, period, interval) -> DataFrame memo so back-to-back
+# calls within one update cycle share a single history request
+_history_cache = {}
+_HISTORY_TTL = 10.0
+
+def _get_ticker(symbol):
+    """Get (or create and cache) the yf.Ticker for a symbol"""
+    ticker = _ticker_cache.get(symbol)
+    if ticker is None:
+        ticker = yf.Ticker(symbol)
+        _ticker_cache[symbol] = ticker
+    return ticker
+
+def _fetch_history(symbol, interval, candles_needed):
+    """Fetch history for a symbol, memoized for a few seconds"""
+    period = get_period_for_interval(interval, candles_needed)
+    key = (symbol, period, interval)
+    now = time.monotonic()
+
+    hit = _history_cache.get(key)
+    if hit is not None and now - hit[1] < _HISTORY_TTL:
+        return hit[0]
+
+    df = _get_ticker(symbol).history(period=period, interval=interval)
+    _history_cache[key] = (df, now)
+    return df
+
 def get_period_for_interval(interval, candles_needed):
     """Calculate appropriate period for yfinance"""
     period_map = {
@@ -17,24 +67,185 @@ def get_period_for_interval(interval, candles_needed):
     }
     return period_map.get(interval, "60d")
 
+@dataclass
+class Candles:
+    """Structure-of-arrays candle batch (float64/int64 NumPy columns)"""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self):
+        return self.timestamp.shape[0]
+
+def _df_to_candles(df):
+    """Convert a history DataFrame to a Candles batch (no row iteration)"""
+    return Candles(
+        timestamp=df.index.astype('int64').to_numpy() // 10**9,
+        open=df['Open'].to_numpy(dtype=np.float64),
+        high=df['High'].to_numpy(dtype=np.float64),
+        low=df['Low'].to_numpy(dtype=np.float64),
+        close=df['Close'].to_numpy(dtype=np.float64),
+        volume=df['Volume'].to_numpy(dtype=np.float64)
+    )
+
+def candles_to_columnar(candles):
+    """
+    Expose a Candles batch as the columnar {open, high, low, close,
+    volume} dict consumed by the indicators
+    """
+    if candles is None or len(candles) == 0:
+        return None
+
+    return {
+        'open': candles.open,
+        'high': candles.high,
+        'low': candles.low,
+        'close': candles.close,
+        'volume': candles.volume
+    }
+
+async def fetch_history_async(session, symbol, interval, candles_needed):
+    """
+    Fetch candles for one (symbol, interval) straight from Yahoo's chart
+    endpoint, bypassing yfinance's blocking session
+    Returns: (symbol, interval, Candles) - candles may be None
+    """
+    period = get_period_for_interval(interval, candles_needed)
+    params = {'range': period, 'interval': interval}
+
+    try:
+        async with session.get(_CHART_URL.format(symbol=symbol),
+                               params=params) as response:
+            payload = await response.json()
+
+        result = payload['chart']['result'][0]
+        timestamps = result['timestamp']
+        quote = result['indicators']['quote'][0]
+
+        rows = [
+            (int(ts), float(o), float(h), float(l), float(c), float(v or 0))
+            for ts, o, h, l, c, v in zip(timestamps, quote['open'], quote['high'],
+                                         quote['low'], quote['close'], quote['volume'])
+            if c is not None
+        ]
+
+        if not rows:
+            logger.warning("  ⚠️  No data for %s %s", symbol, interval)
+            return symbol, interval, None
+
+        rows = rows[-candles_needed:]
+        ts_arr, o_arr, h_arr, l_arr, c_arr, v_arr = (
+            np.array(col) for col in zip(*rows)
+        )
+        candles = Candles(timestamp=ts_arr.astype(np.int64),
+                          open=o_arr, high=h_arr, low=l_arr,
+                          close=c_arr, volume=v_arr)
+
+        return symbol, interval, candles
+
+    except Exception as e:
+        logger.error("  ❌ Error fetching %s %s: %s", symbol, interval, e)
+        return symbol, interval, None
+
+async def _fetch_all_async(jobs):
+    """Run all (symbol, interval, candles_needed) fetches on one session"""
+    async with aiohttp.ClientSession(headers=_CHART_HEADERS) as session:
+        tasks = [
+            fetch_history_async(session, symbol, interval, candles_needed)
+            for symbol, interval, candles_needed in jobs
+        ]
+        return await asyncio.gather(*tasks)
+
+def fetch_market_data_async(symbols, intervals, candles_per_interval):
+    """
+    Fetch every (symbol, interval) pair concurrently with aiohttp
+    Returns: {symbol: {interval: (candles_with_ts, data)}} or None when
+    aiohttp is not installed
+    """
+    if aiohttp is None:
+        return None
+
+    jobs = [
+        (symbol, interval, candles_per_interval.get(interval, 100))
+        for symbol in symbols
+        for interval in intervals
+    ]
+
+    results = asyncio.run(_fetch_all_async(jobs))
+
+    cache = {symbol: {} for symbol in symbols}
+    for symbol, interval, candles in results:
+        if candles:
+            cache[symbol][interval] = (candles, candles_to_columnar(candles))
+
+    return cache
+
+def fetch_market_data_bulk(symbols, interval, candles_needed):
+    """
+    Fetch market data for multiple symbols in one Yahoo Finance request
+    Returns: dict {symbol: (candles, data)} where candles is a Candles
+    batch and data is the columnar OHLCV dict
+    """
+    try:
+        period = get_period_for_interval(interval, candles_needed)
+
+        df = yf.download(
+            tickers=" ".join(symbols),
+            period=period,
+            interval=interval,
+            group_by='ticker',
+            threads=True,
+            progress=False,
+            auto_adjust=True
+        )
+
+        if df is None or df.empty:
+            logger.warning("  ⚠️  No bulk data for %s", interval)
+            return {}
+
+        results = {}
+        for symbol in symbols:
+            if isinstance(df.columns, pd.MultiIndex):
+                if symbol not in df.columns.levels[0]:
+                    logger.warning("  ⚠️  No data for %s %s", symbol, interval)
+                    continue
+                sym_df = df[symbol]
+            else:
+                sym_df = df
+
+            sym_df = sym_df.dropna(subset=['Close']).tail(candles_needed)
+
+            if sym_df.empty:
+                logger.warning("  ⚠️  No data for %s %s", symbol, interval)
+                continue
+
+            candles = _df_to_candles(sym_df)
+            results[symbol] = (candles, candles_to_columnar(candles))
+
+        return results
+
+    except Exception as e:
+        logger.error("  ❌ Error bulk fetching %s: %s", interval, e)
+        return {}
+
 def fetch_market_data(symbol, interval, candles_needed):
     """
     Fetch market data from Yahoo Finance
     Returns: dict with keys [open, high, low, close, volume] as lists
     """
     try:
-        period = get_period_for_interval(interval, candles_needed)
-        
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
-        
+        df = _fetch_history(symbol, interval, candles_needed)
+
         if df.empty:
-            print(f"  ⚠️  No data for {symbol} {interval}")
+            logger.warning("  ⚠️  No data for %s %s", symbol, interval)
             return None
-        
+
         # Take only needed candles
         df = df.tail(candles_needed)
-        
+
         # Convert to simple dict format
         data = {
             'open': df['Open'].tolist(),
@@ -47,54 +258,56 @@ def fetch_market_data(symbol, interval, candles_needed):
         return data
     
     except Exception as e:
-        print(f"  ❌ Error fetching {symbol} {interval}: {e}")
+        logger.error("  ❌ Error fetching %s %s: %s", symbol, interval, e)
         return None
 
 def fetch_market_data_with_timestamps(symbol, interval, candles_needed):
     """
     Fetch market data with timestamps for database storage
-    Returns: list of dicts with keys [timestamp, open, high, low, close, volume]
+    Returns: a Candles batch with [timestamp, open, high, low, close, volume]
     """
     try:
-        period = get_period_for_interval(interval, candles_needed)
-        
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
-        
+        df = _fetch_history(symbol, interval, candles_needed)
+
         if df.empty:
-            print(f"  ⚠️  No data for {symbol} {interval}")
+            logger.warning("  ⚠️  No data for %s %s", symbol, interval)
             return None
-        
+
         # Take only needed candles
         df = df.tail(candles_needed)
-        
+
         # Convert to list of dicts with timestamps
-        candles = []
-        for idx, row in df.iterrows():
-            candles.append({
-                'timestamp': int(idx.timestamp()),
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'volume': float(row['Volume'])
-            })
-        
-        return candles
+        return _df_to_candles(df)
     
     except Exception as e:
-        print(f"  ❌ Error fetching {symbol} {interval}: {e}")
+        logger.error("  ❌ Error fetching %s %s: %s", symbol, interval, e)
         return None
 
+# symbol -> (price, fetched_at); signal logic tolerates prices up to a
+# minute old, so repeat lookups within the TTL skip the Yahoo round-trip
+_price_cache = {}
+_PRICE_TTL = 15.0
+
 def fetch_current_price(symbol):
+    """Current price for a symbol, cached for a short TTL"""
+    now = time.monotonic()
+    hit = _price_cache.get(symbol)
+    if hit is not None and now - hit[1] < _PRICE_TTL:
+        return hit[0]
+
+    price = _fetch_current_price_uncached(symbol)
+    _price_cache[symbol] = (price, now)
+    return price
+
+def _fetch_current_price_uncached(symbol):
     """
     Fetch the current market price for a symbol.
     Tries to get 'regularMarketPrice' or 'currentPrice' from ticker info.
     Falls back to the last close price from 1d history.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        
+        ticker = _get_ticker(symbol)
+
         # First, try to get the current price from ticker.info
         info = ticker.info
         if 'regularMarketPrice' in info and info['regularMarketPrice'] is not None:
@@ -109,5 +322,5 @@ def fetch_current_price(symbol):
             
         return 0
     except Exception as e:
-        print(f"  ❌ Error fetching current price for {symbol}: {e}")
+        logger.error("  ❌ Error fetching current price for %s: %s", symbol, e)
         return 0
@@ -2,49 +2,147 @@
 # backend/data_processor.py - FIXED VERSION
 # No problematic imports, uses direct calls
 # ============================================
+import queue
+import threading
 import time
-import pandas as pd
+from bisect import bisect_right
+import numpy as np
+from collections import defaultdict, deque
 from datetime import datetime
-from data_fetcher import fetch_market_data, fetch_market_data_with_timestamps, fetch_current_price
-from db_manager import save_candles, save_indicator_scores, get_latest_scores, get_latest_score
+from data_fetcher import fetch_market_data_with_timestamps, fetch_current_price, candles_to_columnar
+from db_manager import get_latest_scores, save_candles_multi, save_indicator_scores
+from _logging import get_logger
+
+logger = get_logger(__name__)
 
 # Import the entire module instead of specific functions
 import indicators
 
+# Interval lengths used to pick the freshest cached close as the
+# current price
+INTERVAL_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '1h': 3600, '1d': 86400
+}
+
+# Shortest-first lookup order, so the price scan can stop at the first
+# interval that has data instead of ranking every cached entry
+PRICE_INTERVAL_PRIORITY = tuple(sorted(INTERVAL_SECONDS, key=INTERVAL_SECONDS.get))
+
+# Master-score classification bands; bisect picks the label directly
+# instead of walking an if/elif chain. The top threshold sits above
+# 65.0 but below the score granularity (0.0005, from the .25/.30/.20/.25
+# weights over 2-decimal components), so exactly 65.0 stays BULLISH and
+# everything reachable above it is STRONG_BULLISH, as in the original
+# `score > 65` chain
+CLASSIFICATION_LABELS = (
+    'STRONG_BEARISH', 'BEARISH', 'NEUTRAL', 'BULLISH', 'STRONG_BULLISH'
+)
+CLASSIFICATION_THRESHOLDS = (35, 45, 55, 65.0001)
+
+class _ScoreWindow:
+    """Rolling master-score window with O(1) 9- and 21-bar SMAs"""
+    __slots__ = ('_values', '_sum9', '_sum21')
+
+    def __init__(self):
+        self._values = deque(maxlen=21)
+        self._sum9 = 0.0
+        self._sum21 = 0.0
+
+    def push(self, score):
+        """Add a score; returns (sma9, sma21), None while warming up"""
+        values = self._values
+        if len(values) == 21:
+            self._sum21 -= values[0]
+        if len(values) >= 9:
+            self._sum9 -= values[-9]
+        values.append(score)
+        self._sum9 += score
+        self._sum21 += score
+
+        sma9 = self._sum9 / 9 if len(values) >= 9 else None
+        sma21 = self._sum21 / 21 if len(values) == 21 else None
+        return sma9, sma21
+
 class DataProcessor:
     """Process market data and calculate scores"""
     
     def __init__(self, settings, socketio):
         self.settings = settings
         self.socketio = socketio
+        # Per-cycle cache populated by BackgroundWorker.preload_market_data:
+        # {symbol: {interval: (candles_with_ts, data)}}
+        self.market_data_cache = {}
+        # Memoized indicator results per (symbol, interval): higher
+        # intervals rarely grow a new bar between cycles, so identical
+        # inputs become a dict hit instead of a full recompute
+        self._score_cache = {}
+        # Rolling master-score windows per (symbol, interval) so the SMA
+        # update is O(1) instead of re-reading history from the database
+        self._score_windows = defaultdict(_ScoreWindow)
+        # Symbols whose windows have been seeded from stored history
+        self._primed_windows = set()
+        # Weight vectors per interval combination: the set of intervals
+        # with data almost never changes between cycles, so the array
+        # build and sum happen once per combination, not per call
+        self._weights_cache = {}
+        # Score updates are collected per cycle and emitted as one
+        # WebSocket frame instead of one frame per symbol
+        self._pending_emits = []
+        self._emit_lock = threading.Lock()
+        # Fingerprint of the last broadcast per symbol (to skip emits in
+        # flat markets) and the full payload (to serve new clients)
+        self._last_broadcast_key = {}
+        self._last_payloads = {}
+        # SQLite writes go through a single background writer thread so
+        # the fetch/score path never blocks on disk
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def _writer_loop(self):
+        """Drain queued (fn, args) database writes"""
+        while True:
+            fn, args = self._write_q.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error("  ❌ Error in DB writer: %s", e)
+            finally:
+                self._write_q.task_done()
+
+    def flush_writes(self):
+        """Block until all queued database writes have completed"""
+        self._write_q.join()
     
     def calculate_all_scores(self, data, interval):
         """
         Calculate all indicator scores for a given interval
         Returns dict with minimal essential data only
         """
-        close = pd.Series(data['close'])
-        high = pd.Series(data['high'])
-        low = pd.Series(data['low'])
-        volume = data['volume']
-        
+        # Convert each column to a float64 array once; every indicator
+        # kernel works on these shared buffers directly
+        close_arr = np.asarray(data['close'], dtype=np.float64)
+        high_arr = np.asarray(data['high'], dtype=np.float64)
+        low_arr = np.asarray(data['low'], dtype=np.float64)
+        volume_arr = np.asarray(data['volume'], dtype=np.float64)
+
         # Calculate scores using indicators module
-        rsi_score, rsi_value, rsi_extreme = indicators.calculate_rsi_score(close)
-        macd_score = indicators.calculate_macd_score(close)
-        adx_score = indicators.calculate_adx_score(high, low, close)
-        supertrend_score = indicators.calculate_supertrend_score(high, low, close)
-        
+        rsi_score, rsi_value, rsi_extreme = indicators.calculate_rsi_score(close_arr)
+        macd_score = indicators.calculate_macd_score(close_arr)
+        adx_score = indicators.calculate_adx_score(high_arr, low_arr, close_arr)
+        supertrend_score = indicators.calculate_supertrend_score(high_arr, low_arr, close_arr)
+
         # Calculate support/resistance
-        support, resistance = indicators.calculate_support_resistance(high, low, close)
-        
+        support, resistance = indicators.calculate_support_resistance(high_arr, low_arr, close_arr)
+
         # Calculate volume analysis
-        avg_volume, volume_ratio, high_volume = indicators.calculate_volume_analysis(volume)
-        
+        avg_volume, volume_ratio, high_volume = indicators.calculate_volume_analysis(volume_arr)
+
         # Calculate ATR
-        current_atr, avg_atr_20 = indicators.calculate_atr(high, low, close)
-        
+        current_atr, avg_atr_20 = indicators.calculate_atr(high_arr, low_arr, close_arr)
+
         # Calculate swing levels
-        swing_low, swing_high = indicators.calculate_swing_levels(high, low)
+        swing_low, swing_high = indicators.calculate_swing_levels(high_arr, low_arr)
         
         # Calculate average total score
         avg_total_score = (rsi_score + macd_score + adx_score + supertrend_score) / 4
@@ -96,17 +194,10 @@ class DataProcessor:
         )
         
         # Classification
-        if master_score > 65:
-            classification = 'STRONG_BULLISH'
-        elif master_score >= 55:
-            classification = 'BULLISH'
-        elif master_score >= 45:
-            classification = 'NEUTRAL'
-        elif master_score >= 35:
-            classification = 'BEARISH'
-        else:
-            classification = 'STRONG_BEARISH'
-        
+        classification = CLASSIFICATION_LABELS[
+            bisect_right(CLASSIFICATION_THRESHOLDS, master_score)
+        ]
+
         return round(master_score, 2), classification
     
     def calculate_weighted_indicators(self, interval_scores, timeframe_weights):
@@ -114,68 +205,64 @@ class DataProcessor:
         Calculate weighted indicator scores across timeframes
         Returns: dict with weighted {rsi, macd, adx, supertrend}
         """
-        weighted = {
-            'rsi': 0,
-            'macd': 0,
-            'adx': 0,
-            'supertrend': 0
+        key = tuple(interval_scores)
+        cached = self._weights_cache.get(key)
+        if cached is None:
+            weights = np.array(
+                [timeframe_weights[interval] for interval in key],
+                dtype=np.float64
+            )
+            cached = self._weights_cache[key] = (weights, weights.sum())
+        weights, total_weight = cached
+
+        scores = np.array(
+            [[s['rsi_score'], s['macd_score'], s['adx_score'], s['supertrend_score']]
+             for s in interval_scores.values()],
+            dtype=np.float64
+        )
+        if len(scores) and total_weight > 0:
+            weighted_vec = (weights @ scores) / total_weight
+        else:
+            weighted_vec = np.zeros(4)
+
+        return {
+            'rsi': round(float(weighted_vec[0]), 2),
+            'macd': round(float(weighted_vec[1]), 2),
+            'adx': round(float(weighted_vec[2]), 2),
+            'supertrend': round(float(weighted_vec[3]), 2)
         }
-        
-        total_weight = 0
-        
-        for interval, scores in interval_scores.items():
-            weight = timeframe_weights.get(interval, 0)
-            weighted['rsi'] += scores['rsi_score'] * weight
-            weighted['macd'] += scores['macd_score'] * weight
-            weighted['adx'] += scores['adx_score'] * weight
-            weighted['supertrend'] += scores['supertrend_score'] * weight
-            total_weight += weight
-        
-        # Normalize
-        if total_weight > 0:
-            for key in weighted:
-                weighted[key] = round(weighted[key] / total_weight, 2)
-        
-        return weighted
-    
-    def calculate_sma(self, data, period):
-        """
-        Calculate Simple Moving Average
-        """
-        if len(data) < period:
-            return [None] * len(data)
-        
-        sma_values = pd.Series(data).rolling(window=period).mean().tolist()
-        return [round(x, 2) if x is not None else None for x in sma_values]
     
     def update_symbol_data(self, symbol, historical_limit=None):
         """Fetch data, calculate scores"""
-        print(f"\n{'='*50}")
-        print(f"📊 Updating {symbol} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*50}")
-        
-        current_price = fetch_current_price(symbol)
-        print(f"  💰 Current price: ${current_price:.2f}")
+        logger.info("\n%s\n📊 Updating %s - %s\n%s", '=' * 50, symbol,
+                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'), '=' * 50)
         
         interval_scores = self.fetch_and_calculate_scores(
             symbol, historical_limit
         )
-        
+
         if not interval_scores:
-            print("  ⚠️  No interval data available")
+            logger.warning("  ⚠️  No interval data available")
             return None, None, None, None
+
+        # The shortest interval's last close is the current price; only
+        # fall back to the expensive ticker.info scrape without it
+        current_price = self._current_price_from_cache(symbol)
+        if current_price is None:
+            current_price = fetch_current_price(symbol)
+        logger.info("  💰 Current price: $%.2f", current_price)
         
         weighted_indicators = self.calculate_weighted_indicators(
-            interval_scores, self.settings['timeframeWeights']
+            interval_scores, self.settings['_timeframe_weights']
         )
         
         overall_master_score, classification = self.calculate_master_score(
             weighted_indicators
         )
         
-        print(f"\n  🎯 Overall Master Score: {overall_master_score:.2f} ({classification})")
+        logger.info("\n  🎯 Overall Master Score: %.2f (%s)", overall_master_score, classification)
         
-        interval_smas = self.calculate_interval_smas(symbol, historical_limit)
+        interval_smas = self.calculate_interval_smas(symbol, interval_scores)
         
         self.save_and_emit_data(
             symbol, current_price, overall_master_score, classification,
@@ -184,58 +271,107 @@ class DataProcessor:
         
         return overall_master_score, weighted_indicators, interval_scores, current_price
     
+    def _current_price_from_cache(self, symbol):
+        """Last close of the shortest cached interval, or None"""
+        cached = self.market_data_cache.get(symbol)
+        if not cached:
+            return None
+
+        for interval in PRICE_INTERVAL_PRIORITY:
+            entry = cached.get(interval)
+            if entry is not None:
+                data = entry[1]
+                if data is not None and len(data['close']):
+                    return data['close'][-1]
+
+        # Unknown intervals are a last resort, in cache order
+        for interval, (candles_with_ts, data) in cached.items():
+            if interval not in INTERVAL_SECONDS and data is not None and len(data['close']):
+                return data['close'][-1]
+
+        return None
+
     def fetch_and_calculate_scores(self, symbol, historical_limit):
         """Fetch market data and calculate indicator scores"""
         interval_scores = {}
-        
-        for interval in self.settings['intervals']:
-            candles_needed = self.settings['candlesPerInterval'].get(interval, 100)
-            max_candles = self.settings['maxCandlesStored'].get(interval, 100)
+        pending_candles = {}
+        max_by_interval = {}
+
+        for interval, candles_needed, max_candles in self.settings['_interval_plan']:
             fetch_limit = historical_limit if historical_limit else candles_needed
-            
-            candles_with_ts = fetch_market_data_with_timestamps(
-                symbol, interval, fetch_limit
-            )
-            
+
+            cached = None
+            if historical_limit is None:
+                cached = self.market_data_cache.get(symbol, {}).get(interval)
+
+            if cached:
+                candles_with_ts, data = cached
+            else:
+                candles_with_ts = fetch_market_data_with_timestamps(
+                    symbol, interval, fetch_limit
+                )
+                data = candles_to_columnar(candles_with_ts)
+
             if candles_with_ts:
-                save_candles(symbol, interval, candles_with_ts, max_candles)
-                data = fetch_market_data(symbol, interval, fetch_limit)
-                
+                pending_candles[interval] = candles_with_ts
+                max_by_interval[interval] = max_candles
+
                 if data:
-                    scores = self.calculate_all_scores(data, interval)
-                    interval_master_score = self.calculate_master_score_for_interval(scores)
-                    scores['master_score'] = interval_master_score
+                    # (last bar timestamp, last close, length) pins the
+                    # inputs; the last close catches a still-forming bar
+                    key = (int(candles_with_ts.timestamp[-1]),
+                           float(data['close'][-1]), len(candles_with_ts))
+                    hit = self._score_cache.get((symbol, interval))
+                    if hit is not None and hit[0] == key:
+                        # Cached dict already carries its master_score
+                        scores = hit[1]
+                    else:
+                        scores = self.calculate_all_scores(data, interval)
+                        scores['master_score'] = \
+                            self.calculate_master_score_for_interval(scores)
+                        self._score_cache[(symbol, interval)] = (key, scores)
+                    interval_master_score = scores['master_score']
                     interval_scores[interval] = scores
-                    print(f"  ✅ {interval}: Master Score = {interval_master_score:.2f}")
-        
+                    logger.info("  ✅ %s: Master Score = %.2f", interval, interval_master_score)
+
+        # All intervals land in one transaction (one fsync per symbol)
+        if pending_candles:
+            self._write_q.put(
+                (save_candles_multi, (symbol, pending_candles, max_by_interval))
+            )
+
         return interval_scores
     
-    def calculate_interval_smas(self, symbol, historical_limit):
-        """Calculate SMAs for each interval"""
-        interval_master_score_histories = {
-            interval: [] for interval in self.settings['intervals']
-        }
-        
-        score_history_limit = historical_limit if historical_limit else 50
-        all_scores_history = get_latest_scores(symbol, limit=score_history_limit)
-        
-        for score_entry in all_scores_history:
-            for interval_key, interval_data in score_entry['intervals'].items():
-                if 'master_score' in interval_data:
-                    interval_master_score_histories[interval_key].append(
-                        interval_data['master_score']
-                    )
-        
+    def _prime_score_windows(self, symbol):
+        """Seed the rolling windows from stored history (one read, once)
+
+        Without this the SMAs restart cold after every process restart
+        and stay None for up to 21 cycles even though the history is
+        sitting in indicators_score.
+        """
+        for row in get_latest_scores(symbol, limit=21):
+            for interval, scores in row['intervals'].items():
+                master_score = scores.get('master_score')
+                if master_score is not None:
+                    self._score_windows[(symbol, interval)].push(master_score)
+
+    def calculate_interval_smas(self, symbol, interval_scores):
+        """Update rolling master-score windows and return SMAs per interval"""
+        if symbol not in self._primed_windows:
+            self._primed_windows.add(symbol)
+            self._prime_score_windows(symbol)
+
         interval_smas = {}
-        for interval, history in interval_master_score_histories.items():
-            sma9_list = self.calculate_sma(history, 9)
-            sma21_list = self.calculate_sma(history, 21)
-            
+
+        for interval, scores in interval_scores.items():
+            window = self._score_windows[(symbol, interval)]
+            sma9, sma21 = window.push(scores['master_score'])
+
             interval_smas[interval] = {
-                'master_score_sma9': sma9_list[-1] if sma9_list and len(sma9_list) > 0 else None,
-                'master_score_sma21': sma21_list[-1] if sma21_list and len(sma21_list) > 0 else None
+                'master_score_sma9': round(sma9, 2) if sma9 is not None else None,
+                'master_score_sma21': round(sma21, 2) if sma21 is not None else None
             }
-        
+
         return interval_smas
     
     def save_and_emit_data(self, symbol, current_price, overall_master_score,
@@ -253,9 +389,9 @@ class DataProcessor:
             'interval_smas': interval_smas
         }
         
-        save_indicator_scores(symbol, scores_to_save)
+        self._write_q.put((save_indicator_scores, (symbol, scores_to_save)))
         
-        self.socketio.emit('score_update', {
+        payload = {
             'symbol': symbol,
             'timestamp': current_timestamp,
             'master_score': overall_master_score,
@@ -264,4 +400,41 @@ class DataProcessor:
             'current_price': current_price,
             'intervals': interval_scores,
             'interval_smas': interval_smas
-        })
+        }
+
+        # Flat markets produce identical payloads cycle after cycle;
+        # skip the broadcast when nothing the client renders moved (the
+        # timestamp alone changing is not worth a frame). The rolling
+        # SMAs keep turning over even while scores are flat, so they
+        # must be part of the fingerprint
+        key = (overall_master_score, classification, current_price,
+               tuple(weighted_indicators.values()),
+               tuple((interval, scores['master_score'])
+                     for interval, scores in interval_scores.items()),
+               tuple((interval, smas['master_score_sma9'],
+                      smas['master_score_sma21'])
+                     for interval, smas in interval_smas.items()))
+
+        with self._emit_lock:
+            self._last_payloads[symbol] = payload
+            if self._last_broadcast_key.get(symbol) == key:
+                return
+            self._last_broadcast_key[symbol] = key
+            self._pending_emits.append(payload)
+
+    def latest_payloads(self):
+        """Last computed payload per symbol, for a new client's first push"""
+        with self._emit_lock:
+            return list(self._last_payloads.values())
+
+    def flush_emits(self):
+        """Emit all pending score updates as a single batched frame"""
+        with self._emit_lock:
+            pending = self._pending_emits
+            self._pending_emits = []
+
+        if pending:
+            # The cycle timestamp lets clients order batches that arrive
+            # out of sequence after a reconnect
+            self.socketio.emit('score_updates_batch',
+                               {'updates': pending, 'ts': int(time.time())})
@@ -2,18 +2,70 @@
 # backend/db_manager.py
 # Database Manager with Auto-Cleanup
 # ============================================
+import hashlib
 import sqlite3
 import json
 import os
+import threading
 from datetime import datetime
 
+import numpy as np
+
+from _logging import get_logger
+
+logger = get_logger(__name__)
+
+# orjson en/decodes the score payloads several times faster than stdlib
+# json and handles NumPy scalars natively; fall back when not installed
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+# zstd shrinks the JSON payload blob ~5-10x; plain orjson bytes are
+# stored when it isn't installed (the magic prefix tells them apart)
+try:
+    import zstandard
+    _zstd_compress = zstandard.ZstdCompressor(level=3).compress
+    _zstd_decompress = zstandard.ZstdDecompressor().decompress
+except ImportError:
+    _zstd_compress = None
+    _zstd_decompress = None
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Digest of the last score row written per symbol, to skip rewriting
+# identical snapshots
+_last_score_digest = {}
+
+def _pack_payload(obj):
+    """Encode (and compress, when available) a score payload dict"""
+    raw = _dumps(obj)
+    if _zstd_compress is not None:
+        return _zstd_compress(raw)
+    return raw
+
+def _unpack_payload(blob):
+    """Decode a payload blob written by _pack_payload"""
+    if blob[:4] == _ZSTD_MAGIC:
+        blob = _zstd_decompress(blob)
+    return _loads(blob)
+
 DB_DIR = 'db'
 
 def ensure_db_directory():
     """Create db directory if it doesn't exist"""
     if not os.path.exists(DB_DIR):
         os.makedirs(DB_DIR)
-        print(f"✅ Created directory: {DB_DIR}/")
+        logger.info("✅ Created directory: %s/", DB_DIR)
 
 def get_db_path(symbol):
     """Get database path for a symbol"""
@@ -22,17 +74,76 @@ def get_db_path(symbol):
     safe_symbol = symbol.replace('/', '-').replace('^', '')
     return os.path.join(DB_DIR, f"{safe_symbol}.sqlite")
 
-def get_connection(symbol):
-    """Get database connection for a symbol"""
-    db_path = get_db_path(symbol)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+# WAL cuts fsyncs and lets readers run alongside the writer; the rest
+# keep temp structures and hot pages in memory and mmap reads
+_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-20000;
+'''
+
+# One pooled connection per (thread, symbol): reopening a handle
+# re-runs the PRAGMAs, re-parses the schema and throws away the page
+# cache, and SQLite connections aren't shareable across threads
+_local = threading.local()
+
+def get_connection(symbol, read_only=False):
+    """Get the pooled database connection for a symbol
+
+    read_only connections are pooled separately with query_only set, so
+    the Flask handler threads can never write through a reader handle.
+    """
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+
+    key = (symbol, read_only)
+    conn = pool.get(key)
+    if conn is None:
+        # A larger statement cache keeps the per-interval INSERT/DELETE
+        # plans prepared across calls
+        conn = sqlite3.connect(get_db_path(symbol), cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_PRAGMAS)
+        if read_only:
+            conn.execute('PRAGMA query_only=ON')
+        pool[key] = conn
     return conn
 
 def sanitize_interval(interval):
     """Convert interval to safe table name"""
     return interval.replace('m', 'min').replace('h', 'hr').replace('d', 'day')
 
+# SQL text per candle table, built once instead of re-formatting the
+# same f-strings on every save (identical text also means sqlite3's
+# statement cache can reuse the prepared plan)
+_REPLACE_SQL = {}
+_IGNORE_SQL = {}
+_DELETE_SQL = {}
+
+def _candle_sql(safe_interval):
+    """Get (replace_sql, ignore_sql, delete_sql) for a table, cached"""
+    replace_sql = _REPLACE_SQL.get(safe_interval)
+    if replace_sql is None:
+        values = '(timestamp, open, high, low, close, volume)\n            VALUES (?, ?, ?, ?, ?, ?)'
+        replace_sql = _REPLACE_SQL[safe_interval] = (
+            f'INSERT OR REPLACE INTO candles_{safe_interval}\n            {values}'
+        )
+        _IGNORE_SQL[safe_interval] = (
+            f'INSERT OR IGNORE INTO candles_{safe_interval}\n            {values}'
+        )
+        _DELETE_SQL[safe_interval] = f'''
+            DELETE FROM candles_{safe_interval}
+            WHERE timestamp < COALESCE((
+                SELECT timestamp FROM candles_{safe_interval}
+                ORDER BY timestamp DESC
+                LIMIT 1 OFFSET ?
+            ), 0)
+        '''
+    return replace_sql, _IGNORE_SQL[safe_interval], _DELETE_SQL[safe_interval]
+
 def init_db(symbol, intervals):
     """Initialize database tables for a symbol"""
     conn = get_connection(symbol)
@@ -52,8 +163,15 @@ def init_db(symbol, intervals):
             )
         ''')
         cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_candles_{safe_interval}_ts ON candles_{safe_interval}(timestamp DESC)')
+        # Covering index: the chart reads resolve entirely from one
+        # index-range scan instead of a heap fetch per row
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_candles_{safe_interval}_cover
+            ON candles_{safe_interval}(timestamp DESC, open, high, low, close, volume)
+        ''')
     
-    # Create indicators_score table
+    # Create indicators_score table; the three legacy *_json columns are
+    # kept readable but new rows store one packed payload blob
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS indicators_score (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,66 +180,73 @@ def init_db(symbol, intervals):
             master_score REAL,
             classification TEXT,
             weighted_indicators_json TEXT,
-            interval_smas_json TEXT
+            interval_smas_json TEXT,
+            payload BLOB
         )
     ''')
+    # Migrate databases created before the payload column existed
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(indicators_score)')]
+    if 'payload' not in columns:
+        cursor.execute('ALTER TABLE indicators_score ADD COLUMN payload BLOB')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_indicators_ts ON indicators_score(timestamp DESC)')
     
     conn.commit()
-    conn.close()
-    print(f"✅ Database initialized for {symbol}")
+    logger.info("✅ Database initialized for %s", symbol)
+
+def _candle_rows(candles_data):
+    """Row tuples for insertion (tolist() converts NumPy scalars to
+    native Python types for the sqlite3 driver)"""
+    return list(zip(
+        candles_data.timestamp.tolist(),
+        candles_data.open.tolist(),
+        candles_data.high.tolist(),
+        candles_data.low.tolist(),
+        candles_data.close.tolist(),
+        candles_data.volume.tolist()
+    ))
 
 def save_candles(symbol, interval, candles_data, max_candles):
     """
     Save candles to database and cleanup old data
-    candles_data: list of dicts with keys [timestamp, open, high, low, close, volume]
+    candles_data: a data_fetcher.Candles column batch
+    """
+    save_candles_multi(symbol, {interval: candles_data}, {interval: max_candles})
+
+def save_candles_multi(symbol, per_interval, max_candles_by_interval):
+    """
+    Save candle batches for several intervals in one transaction
+    per_interval: {interval: Candles}
+    max_candles_by_interval: {interval: max_candles}
     """
-    if not candles_data:
-        return
-    
     conn = get_connection(symbol)
-    cursor = conn.cursor()
-    safe_interval = sanitize_interval(interval)
-    
-    # Insert or replace candles
-    for candle in candles_data:
-        cursor.execute(f'''
-            INSERT OR REPLACE INTO candles_{safe_interval}
-            (timestamp, open, high, low, close, volume)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            candle['timestamp'],
-            candle['open'],
-            candle['high'],
-            candle['low'],
-            candle['close'],
-            candle['volume']
-        ))
-    
-    conn.commit()
-    
-    # Cleanup old candles
-    cleanup_old_candles(cursor, safe_interval, max_candles)
-    
-    conn.commit()
-    conn.close()
+
+    # One executemany per interval inside a single transaction: one
+    # statement prepare per table and one fsync for all the batches
+    # plus their cleanups
+    with conn:
+        for interval, candles_data in per_interval.items():
+            if candles_data is None or len(candles_data) == 0:
+                continue
+
+            safe_interval = sanitize_interval(interval)
+            replace_sql, ignore_sql, _ = _candle_sql(safe_interval)
+            rows = _candle_rows(candles_data)
+            # Closed candles are immutable: OR IGNORE skips the
+            # delete+reinsert churn on re-fetched history, and only the
+            # still-forming last bar is actually replaced
+            conn.executemany(ignore_sql, rows[:-1])
+            conn.execute(replace_sql, rows[-1])
+            cleanup_old_candles(conn.cursor(), safe_interval,
+                                max_candles_by_interval.get(interval, 100))
 
 def cleanup_old_candles(cursor, safe_interval, max_candles):
     """Delete oldest candles to keep only max_candles"""
-    cursor.execute(f'SELECT COUNT(*) FROM candles_{safe_interval}')
-    total = cursor.fetchone()[0]
-    
-    if total > max_candles:
-        delete_count = total - max_candles
-        cursor.execute(f'''
-            DELETE FROM candles_{safe_interval}
-            WHERE timestamp IN (
-                SELECT timestamp FROM candles_{safe_interval}
-                ORDER BY timestamp ASC
-                LIMIT ?
-            )
-        ''', (delete_count,))
-        print(f"  🗑️  Deleted {delete_count} old candles from {safe_interval}")
+    # Single index-tail DELETE: everything older than the max_candles-th
+    # newest timestamp goes, with no COUNT(*) scan first
+    _, _, delete_sql = _candle_sql(safe_interval)
+    cursor.execute(delete_sql, (max_candles - 1,))
+    if cursor.rowcount > 0:
+        logger.debug("  🗑️  Deleted %d old candles from %s", cursor.rowcount, safe_interval)
 
 def save_indicator_scores(symbol, scores_dict, max_scores=500):
     """
@@ -135,126 +260,222 @@ def save_indicator_scores(symbol, scores_dict, max_scores=500):
         'interval_smas': dict # New field
     }
     """
-    conn = get_connection(symbol)
-    cursor = conn.cursor()
-    
     timestamp = scores_dict['timestamp']
-    intervals_json = json.dumps(scores_dict.get('intervals', {}))
     master_score = scores_dict.get('master_score', 0)
     classification = scores_dict.get('classification', 'NEUTRAL')
-    weighted_indicators_json = json.dumps(scores_dict.get('weighted_indicators', {}))
-    interval_smas_json = json.dumps(scores_dict.get('interval_smas', {})) # New line
-    
+    # One packed blob instead of three separately serialized TEXT columns
+    raw = _dumps({
+        'intervals': scores_dict.get('intervals', {}),
+        'weighted_indicators': scores_dict.get('weighted_indicators', {}),
+        'interval_smas': scores_dict.get('interval_smas', {})
+    })
+
+    # Markets are quiet most of the time: if nothing but the timestamp
+    # changed since the last row, skip the write (and its fsync) entirely
+    digest = hashlib.md5(_dumps((master_score, classification)) + raw).digest()
+    if _last_score_digest.get(symbol) == digest:
+        return
+    _last_score_digest[symbol] = digest
+
+    payload = _zstd_compress(raw) if _zstd_compress is not None else raw
+
+    conn = get_connection(symbol)
+    cursor = conn.cursor()
+
     cursor.execute('''
         INSERT OR REPLACE INTO indicators_score
-        (timestamp, intervals_json, master_score, classification, weighted_indicators_json, interval_smas_json)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (timestamp, intervals_json, master_score, classification, weighted_indicators_json, interval_smas_json))
-    
-    conn.commit()    
-    # Cleanup old scores
-    cursor.execute('SELECT COUNT(*) FROM indicators_score')
-    total = cursor.fetchone()[0]
-    
-    if total > max_scores:
-        delete_count = total - max_scores
-        cursor.execute('''
-            DELETE FROM indicators_score
-            WHERE id IN (
-                SELECT id FROM indicators_score
-                ORDER BY timestamp ASC
-                LIMIT ?
-            )
-        ''', (delete_count,))
-        print(f"  🗑️  Deleted {delete_count} old indicator scores")
+        (timestamp, master_score, classification, payload)
+        VALUES (?, ?, ?, ?)
+    ''', (timestamp, master_score, classification, payload))
     
     conn.commit()
-    conn.close()
+    # Cleanup old scores with one index-tail DELETE (no COUNT scan)
+    cursor.execute('''
+        DELETE FROM indicators_score
+        WHERE id < COALESCE((
+            SELECT id FROM indicators_score
+            ORDER BY id DESC
+            LIMIT 1 OFFSET ?
+        ), 0)
+    ''', (max_scores - 1,))
+    if cursor.rowcount > 0:
+        logger.debug("  🗑️  Deleted %d old indicator scores", cursor.rowcount)
+
+    conn.commit()
 
 def get_candles(symbol, interval, limit=100):
     """Get candles for charting"""
-    conn = get_connection(symbol)
+    conn = get_connection(symbol, read_only=True)
+    # Plain tuples: sqlite3.Row's string lookups walk the column-name
+    # list per access, which adds up over limit rows
     cursor = conn.cursor()
+    cursor.row_factory = None
     safe_interval = sanitize_interval(interval)
-    
+
     cursor.execute(f'''
-        SELECT * FROM candles_{safe_interval}
+        SELECT timestamp, open, high, low, close, volume
+        FROM candles_{safe_interval}
         ORDER BY timestamp DESC
         LIMIT ?
     ''', (limit,))
-    
-    rows = cursor.fetchall()
-    conn.close()
-    
+
     # Convert to list of dicts (reverse for chronological order)
-    candles = []
-    for row in reversed(rows):
-        candles.append({
-            'timestamp': row['timestamp'],
-            'open': row['open'],
-            'high': row['high'],
-            'low': row['low'],
-            'close': row['close'],
-            'volume': row['volume']
-        })
-    
-    return candles
+    return [
+        {'timestamp': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for t, o, h, l, c, v in reversed(cursor.fetchall())
+    ]
+
+def get_candles_columnar(symbol, interval, limit=100):
+    """
+    Get candles as a dict of contiguous NumPy columns (chronological).
+    Six arrays instead of limit dicts - feeds the indicator kernels and
+    serializes without materializing Python floats.
+    """
+    conn = get_connection(symbol, read_only=True)
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    safe_interval = sanitize_interval(interval)
+
+    cursor.execute(f'''
+        SELECT timestamp, open, high, low, close, volume
+        FROM candles_{safe_interval}
+        ORDER BY timestamp DESC
+        LIMIT ?
+    ''', (limit,))
+
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    # One transposed copy turns every column into a contiguous row;
+    # column slices of the row-major matrix are strided views, which
+    # orjson's OPT_SERIALIZE_NUMPY rejects
+    cols = np.ascontiguousarray(np.array(rows, dtype=np.float64)[::-1].T)
+    return {
+        'timestamp': cols[0].astype(np.int64),
+        'open': cols[1],
+        'high': cols[2],
+        'low': cols[3],
+        'close': cols[4],
+        'volume': cols[5]
+    }
 
 def get_latest_scores(symbol, limit=100):
     """Get latest indicator scores"""
-    conn = get_connection(symbol)
+    conn = get_connection(symbol, read_only=True)
     cursor = conn.cursor()
-    
+    cursor.row_factory = None
+
     cursor.execute('''
-        SELECT timestamp, master_score, classification, intervals_json, weighted_indicators_json, interval_smas_json
+        SELECT timestamp, master_score, classification, payload,
+               intervals_json, weighted_indicators_json, interval_smas_json
         FROM indicators_score
         ORDER BY timestamp DESC
         LIMIT ?
     ''', (limit,))
-    
+
     rows = cursor.fetchall()
-    conn.close()
-    
+
     # Convert to list of dicts (reverse for chronological order)
     scores = []
-    for row in reversed(rows):
+    for ts, master_score, classification, payload, iv_json, wi_json, smas_json in reversed(rows):
+        if payload is not None:
+            data = _unpack_payload(payload)
+        else:
+            # Row written before the payload column existed
+            data = {
+                'intervals': _loads(iv_json),
+                'weighted_indicators': _loads(wi_json or '{}'),
+                'interval_smas': _loads(smas_json or '{}')
+            }
         scores.append({
-            'timestamp': row['timestamp'],
-            'master_score': row['master_score'],
-            'classification': row['classification'],
-            'intervals': json.loads(row['intervals_json']),
-            'weighted_indicators': json.loads(row['weighted_indicators_json'] or '{}'),
-            'interval_smas': json.loads(row['interval_smas_json'] or '{}')
+            'timestamp': ts,
+            'master_score': master_score,
+            'classification': classification,
+            'intervals': data['intervals'],
+            'weighted_indicators': data['weighted_indicators'],
+            'interval_smas': data['interval_smas']
         })
-    
+
     return scores
 def get_latest_score(symbol):
     """Get the most recent score"""
     scores = get_latest_scores(symbol, limit=1)
     return scores[0] if scores else None
 
+def get_latest_scores_json(symbol, limit=100):
+    """
+    Latest indicator scores as ready-to-serve JSON bytes.
+    When every row in the window carries an uncompressed payload the
+    whole array is assembled inside SQLite with json_group_array, so
+    no Python dicts are built at all; otherwise (zstd enabled or
+    legacy rows present) it falls back to the Python reader.
+    """
+    if _zstd_compress is None:
+        conn = get_connection(symbol, read_only=True)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        missing = cursor.execute('''
+            SELECT count(*) - count(payload) FROM (
+                SELECT payload FROM indicators_score
+                ORDER BY timestamp DESC
+                LIMIT ?
+            )
+        ''', (limit,)).fetchone()[0]
+
+        if missing == 0:
+            # CAST to TEXT: the payload binds as BLOB, and SQLite 3.45+
+            # interprets BLOB arguments to the JSON functions as JSONB,
+            # rejecting plain JSON text bytes as malformed
+            body = cursor.execute('''
+                SELECT json_group_array(json_object(
+                    'timestamp', timestamp,
+                    'master_score', master_score,
+                    'classification', classification,
+                    'intervals', json(json_extract(CAST(payload AS TEXT), '$.intervals')),
+                    'weighted_indicators', json(json_extract(CAST(payload AS TEXT), '$.weighted_indicators')),
+                    'interval_smas', json(json_extract(CAST(payload AS TEXT), '$.interval_smas'))
+                ))
+                FROM (
+                    SELECT * FROM (
+                        SELECT timestamp, master_score, classification, payload
+                        FROM indicators_score
+                        ORDER BY timestamp DESC
+                        LIMIT ?
+                    )
+                    ORDER BY timestamp ASC
+                )
+            ''', (limit,)).fetchone()[0]
+            return body.encode()
+
+    return _dumps(get_latest_scores(symbol, limit))
+
 def get_indicator_scores_history(symbol, interval, limit=100):
     """Get historical indicator scores for a specific interval."""
-    conn = get_connection(symbol)
+    conn = get_connection(symbol, read_only=True)
     cursor = conn.cursor()
-    
+    cursor.row_factory = None
+
     cursor.execute('''
-        SELECT timestamp, intervals_json
+        SELECT timestamp, payload, intervals_json
         FROM indicators_score
         ORDER BY timestamp DESC
         LIMIT ?
     ''', (limit,))
-    
+
     rows = cursor.fetchall()
-    conn.close()
-    
+
     scores = []
-    for row in reversed(rows):
-        intervals = json.loads(row['intervals_json'])
+    for timestamp, payload, iv_json in reversed(rows):
+        if payload is not None:
+            intervals = _unpack_payload(payload)['intervals']
+        else:
+            intervals = _loads(iv_json)
         if interval in intervals:
             interval_scores = intervals[interval]
             score_data = {
-                'timestamp': row['timestamp'],
+                'timestamp': timestamp,
                 'rsi_score': interval_scores.get('rsi_score', 0),
                 'macd_score': interval_scores.get('macd_score', 0),
                 'bb_score': interval_scores.get('bb_score', 0),
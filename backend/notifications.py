@@ -2,16 +2,47 @@
 # backend/notifications.py
 # Updated Notification Templates
 # ============================================
+import queue
+import threading
+import time
+
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+# Alert timestamps have second resolution, so the formatted string is
+# cached and strftime only runs once per second however many messages
+# are built
+_TS_SEC = 0
+_TS_STR = ''
+
+def _ts():
+    """Current 'YYYY-mm-dd HH:MM:SS' string, cached per second"""
+    global _TS_SEC, _TS_STR
+    s = int(time.time())
+    if s != _TS_SEC:
+        _TS_SEC = s
+        _TS_STR = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(s))
+    return _TS_STR
+
+# One pooled session for all alerts: keep-alive reuses the HTTPS
+# connection to Telegram/ntfy instead of paying the TCP+TLS handshake
+# on every send
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 def send_notification(message, settings):
-    """Send notification via configured method"""
+    """Queue a notification for the configured method (non-blocking)"""
     if not settings['notifications']['enabled']:
         return
-    
+
+    # The actual HTTP round-trip happens on the dispatch thread, so a
+    # slow Telegram/ntfy response never stalls the trading loop
+    _send_q.put_nowait((message, settings))
+
+def _dispatch(message, settings):
+    """Send one queued notification via the configured method"""
     method = settings['notifications']['method']
-    
+
     if method == 'telegram':
         send_telegram(message, settings)
     elif method == 'ntfy':
@@ -19,6 +50,20 @@ def send_notification(message, settings):
     else:
         print(f"⚠️  Unknown notification method: {method}")
 
+def _dispatch_loop():
+    """Drain queued notifications in order on the daemon thread"""
+    while True:
+        message, settings = _send_q.get()
+        try:
+            _dispatch(message, settings)
+        except Exception as e:
+            print(f"❌ Notification dispatch error: {e}")
+        finally:
+            _send_q.task_done()
+
+_send_q = queue.Queue()
+threading.Thread(target=_dispatch_loop, daemon=True).start()
+
 def send_telegram(message, settings):
     """Send notification via Telegram bot"""
     token = settings['notifications']['telegram']['token']
@@ -37,7 +82,7 @@ def send_telegram(message, settings):
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = _SESSION.post(url, json=payload, timeout=10)
         if response.status_code == 200:
             print("✅ Telegram notification sent")
         else:
@@ -54,7 +99,7 @@ def send_ntfy(message, settings):
         return
     
     try:
-        response = requests.post(
+        response = _SESSION.post(
             endpoint,
             data=message.encode('utf-8'),
             headers={'Title': 'Live Analyser Alert'},
@@ -71,14 +116,21 @@ def send_ntfy(message, settings):
 # New Notification Templates
 # ============================================
 
-def format_long_entry_signal(symbol, setup_type, entry_price, stop_loss, target, 
-                             master_score, weighted_rsi):
-    """Format LONG entry signal notification"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+# Long and short entry alerts share one body and differ only in the
+# header block, so both formatters delegate to _format_entry
+_LONG_ENTRY_HEADER = """🟢 <b>LONG ENTRY SIGNAL</b>
+🚀 <b>LONG SETUP DETECTED</b>"""
+
+_SHORT_ENTRY_HEADER = """🔴 <b>SHORT ENTRY SIGNAL</b>
+📉 <b>SHORT SETUP DETECTED</b>"""
+
+def _format_entry(header, symbol, setup_type, entry_price, stop_loss, target,
+                  master_score, weighted_rsi):
+    """Build an entry signal message under the given header block"""
+    timestamp = _ts()
     rr_ratio = round(abs(target - entry_price) / abs(entry_price - stop_loss), 1)
-    
-    message = f"""🟢 <b>LONG ENTRY SIGNAL</b>
-🚀 <b>LONG SETUP DETECTED</b>
+
+    return f"""{header}
 
 <b>Symbol:</b> {symbol}
 <b>Type:</b> {setup_type}
@@ -92,36 +144,22 @@ def format_long_entry_signal(symbol, setup_type, entry_price, stop_loss, target,
 <b>Timeframe Alignment:</b> ✅
 
 ⏰ {timestamp}"""
-    
-    return message
+
+def format_long_entry_signal(symbol, setup_type, entry_price, stop_loss, target,
+                             master_score, weighted_rsi):
+    """Format LONG entry signal notification"""
+    return _format_entry(_LONG_ENTRY_HEADER, symbol, setup_type, entry_price,
+                         stop_loss, target, master_score, weighted_rsi)
 
 def format_short_entry_signal(symbol, setup_type, entry_price, stop_loss, target,
                               master_score, weighted_rsi):
     """Format SHORT entry signal notification"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    rr_ratio = round(abs(target - entry_price) / abs(entry_price - stop_loss), 1)
-    
-    message = f"""🔴 <b>SHORT ENTRY SIGNAL</b>
-📉 <b>SHORT SETUP DETECTED</b>
-
-<b>Symbol:</b> {symbol}
-<b>Type:</b> {setup_type}
-<b>Entry:</b> ${entry_price:.2f}
-<b>Stop Loss:</b> ${stop_loss:.2f}
-<b>Target:</b> ${target:.2f}
-<b>Risk:Reward:</b> 1:{rr_ratio}
-
-<b>Master Score:</b> {master_score:.1f}/100
-<b>RSI:</b> {weighted_rsi:.1f}
-<b>Timeframe Alignment:</b> ✅
-
-⏰ {timestamp}"""
-    
-    return message
+    return _format_entry(_SHORT_ENTRY_HEADER, symbol, setup_type, entry_price,
+                         stop_loss, target, master_score, weighted_rsi)
 
 def format_exit_signal(direction, symbol, exit_reason, entry_price, exit_price, pnl, pnl_percent):
     """Format EXIT signal notification"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = _ts()
     pnl_sign = '+' if pnl >= 0 else ''
     
     message = f"""⚠️ <b>EXIT SIGNAL</b>
@@ -140,7 +178,7 @@ def format_exit_signal(direction, symbol, exit_reason, entry_price, exit_price,
 
 def format_setup_alert(symbol, direction, setup_type, master_score, status):
     """Format SETUP alert notification (pre-entry warning)"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = _ts()
     
     message = f"""🔔 <b>SETUP ALERT</b>
 👀 <b>POTENTIAL SETUP FORMING</b>
@@ -157,7 +195,7 @@ def format_setup_alert(symbol, direction, setup_type, master_score, status):
 
 def format_trailing_stop_update(symbol, direction, old_sl, new_sl, current_price):
     """Format trailing stop update notification"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = _ts()
     
     message = f"""🔄 <b>TRAILING STOP UPDATED</b>
 
@@ -173,7 +211,7 @@ def format_trailing_stop_update(symbol, direction, old_sl, new_sl, current_price
 
 def format_daily_summary(stats, daily_pnl):
     """Format daily trading summary"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = _ts()
     pnl_sign = '+' if daily_pnl >= 0 else ''
     
     message = f"""📊 <b>DAILY TRADING SUMMARY</b>
@@ -193,7 +231,7 @@ def format_daily_summary(stats, daily_pnl):
 
 def format_risk_warning(warning_type, details):
     """Format risk management warnings"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = _ts()
     
     if warning_type == 'DAILY_LOSS_LIMIT':
         message = f"""⚠️ <b>RISK WARNING</b>
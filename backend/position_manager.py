@@ -2,12 +2,149 @@
 # backend/position_manager.py
 # Position and Trade Management
 # ============================================
+import atexit
+import queue
 import sqlite3
 import json
+import threading
 import time
-from datetime import datetime
+from datetime import date, datetime
 import os
 
+from _logging import get_logger
+
+logger = get_logger(__name__)
+
+# orjson serializes the signal details dicts several times faster than
+# stdlib json; fall back when not installed (same pattern as db_manager).
+# OPT_SERIALIZE_NUMPY matters here: details carry NumPy scalars from the
+# indicator kernels, which plain orjson rejects
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    _dumps = json.dumps
+
+# Connection tuning, mirroring db_manager: WAL lets the API handlers
+# read while the worker writes, synchronous=NORMAL drops the fsync per
+# commit to one per WAL checkpoint
+_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+'''
+
+# All connections handed out by _connect, so shutdown can close them
+# and let the WAL checkpoint cleanly
+_open_conns = []
+_open_conns_lock = threading.Lock()
+
+# RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# How long dashboard aggregates may be served from memory
+_STATS_TTL = 1.0
+
+# Midnight only moves once a day, so the local day-start epoch is cached
+# against the date ordinal instead of rebuilding a datetime per call
+_day_start_cache = [0, 0]
+
+def _day_start():
+    """Epoch seconds of local midnight today (cached until the date changes)"""
+    ordinal = date.today().toordinal()
+    if ordinal != _day_start_cache[0]:
+        _day_start_cache[0] = ordinal
+        _day_start_cache[1] = int(
+            datetime.now().replace(hour=0, minute=0, second=0,
+                                   microsecond=0).timestamp()
+        )
+    return _day_start_cache[1]
+
+# Hot statements as module constants: the byte-identical SQL text lets
+# the per-connection prepared-statement cache hit on every call
+SQL_INSERT_POSITION = '''
+    INSERT INTO positions
+    (symbol, direction, entry_price, stop_loss, target, position_size,
+     entry_time, setup_type, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'OPEN')
+'''
+
+SQL_CLOSE_POSITION_RETURNING = '''
+    INSERT INTO trades
+    (symbol, direction, entry_price, exit_price, stop_loss, target,
+     position_size, entry_time, exit_time, exit_reason, pnl, pnl_percent, setup_type)
+    SELECT symbol, direction, entry_price, ?, stop_loss, target,
+           position_size, entry_time, ?, ?,
+           (? - entry_price) * position_size
+               * CASE WHEN direction = 'LONG' THEN 1 ELSE -1 END,
+           (? - entry_price) / entry_price * 100
+               * CASE WHEN direction = 'LONG' THEN 1 ELSE -1 END,
+           setup_type
+    FROM positions WHERE id = ?
+    RETURNING symbol, direction, entry_price, pnl, pnl_percent
+'''
+
+SQL_SELECT_POSITION_BY_ID = 'SELECT * FROM positions WHERE id = ?'
+
+SQL_INSERT_TRADE = '''
+    INSERT INTO trades
+    (symbol, direction, entry_price, exit_price, stop_loss, target,
+     position_size, entry_time, exit_time, exit_reason, pnl, pnl_percent, setup_type)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_DELETE_POSITION = 'DELETE FROM positions WHERE id = ?'
+
+SQL_UPDATE_STOP_LOSS = 'UPDATE positions SET stop_loss = ? WHERE id = ?'
+
+SQL_OPEN_POSITIONS = "SELECT * FROM positions WHERE status = 'OPEN'"
+
+SQL_OPEN_POSITIONS_BY_SYMBOL = \
+    "SELECT * FROM positions WHERE symbol = ? AND status = 'OPEN'"
+
+SQL_COUNT_OPEN_POSITIONS = \
+    "SELECT COUNT(*) FROM positions WHERE status = 'OPEN'"
+
+SQL_RECENT_TRADES = 'SELECT * FROM trades ORDER BY exit_time DESC LIMIT ?'
+
+SQL_DAILY_PNL = 'SELECT SUM(pnl) FROM trades WHERE exit_time >= ?'
+
+SQL_TRADING_STATS = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(pnl > 0), 0),
+           COALESCE(SUM(pnl), 0),
+           COALESCE(AVG(pnl), 0)
+    FROM trades
+'''
+
+SQL_LOG_SIGNAL = '''
+    INSERT INTO signals
+    (symbol, signal_type, direction, master_score, timestamp, details)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+SQL_COUNT_TRADES_SINCE = 'SELECT COUNT(*) FROM trades WHERE entry_time >= ?'
+
+def _close_open_connections():
+    """Close any connections still open at interpreter exit"""
+    with _open_conns_lock:
+        for conn in _open_conns:
+            try:
+                # Let SQLite refresh whatever statistics it judged stale
+                # during this run, so the next start plans with them
+                conn.execute('PRAGMA optimize')
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _open_conns.clear()
+
+atexit.register(_close_open_connections)
+
 def _ensure_db_directory(db_path):
     """Create db directory if it doesn't exist"""
     db_dir = os.path.dirname(db_path)
@@ -18,12 +155,36 @@ def _ensure_db_directory(db_path):
 class PositionManager:
     def __init__(self, db_path='db/positions.sqlite'):
         self.db_path = db_path
+        # One long-lived connection per thread: connection setup and the
+        # pragma script run once, and the page cache stays warm across calls
+        self._local = threading.local()
+        # (monotonic timestamp, value) caches for the polled dashboard
+        # aggregates; close_position clears them when trades change
+        self._stats_cache = None
+        self._daily_pnl_cache = None
+        # Signal logging is fire-and-forget, so it goes through a writer
+        # thread that batches bursts into one transaction (same pattern
+        # as the candle writer in data_processor)
+        self._signal_q = queue.Queue()
         _ensure_db_directory(self.db_path)
         self.init_database()
-    
+        threading.Thread(target=self._signal_writer_loop, daemon=True).start()
+
+    def _connect(self):
+        """Get this thread's tuned connection, creating it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30,
+                                   cached_statements=256)
+            conn.executescript(_PRAGMAS)
+            self._local.conn = conn
+            with _open_conns_lock:
+                _open_conns.append(conn)
+        return conn
+
     def init_database(self):
         """Initialize positions and trades database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Open positions table
@@ -74,9 +235,26 @@ class PositionManager:
                 details TEXT
             )
         ''')
-        
+
+        # Indexes for the hot filters/sorts so they stop scanning whole
+        # tables as history grows: (status, symbol) serves the open-
+        # position lookups, (exit_time, pnl) covers the daily-P&L sum
+        # index-only and orders get_recent_trades, entry_time covers the
+        # trades-per-hour count
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_positions_status_symbol
+            ON positions(status, symbol)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trades_exit_time_pnl
+            ON trades(exit_time, pnl)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trades_entry_time
+            ON trades(entry_time)
+        ''')
+
         conn.commit()
-        conn.close()
         print("✅ Position database initialized")
     
     def open_position(self, symbol, direction, entry_price, stop_loss, 
@@ -85,23 +263,18 @@ class PositionManager:
         Open a new position
         Returns: position_id
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         entry_time = int(time.time())
-        
-        cursor.execute('''
-            INSERT INTO positions 
-            (symbol, direction, entry_price, stop_loss, target, position_size, 
-             entry_time, setup_type, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'OPEN')
-        ''', (symbol, direction, entry_price, stop_loss, target, 
-              position_size, entry_time, setup_type))
-        
+
+        with conn:
+            cursor.execute(SQL_INSERT_POSITION,
+                           (symbol, direction, entry_price, stop_loss, target,
+                            position_size, entry_time, setup_type))
+
         position_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
+
         print(f"✅ Position opened: {symbol} {direction} @ {entry_price}")
         return position_id
     
@@ -109,49 +282,63 @@ class PositionManager:
         """
         Close a position and move to trades history
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
-        
-        # Get position details
-        cursor.execute('SELECT * FROM positions WHERE id = ?', (position_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return None
-        
-        # Calculate P&L
-        direction = row[2]
-        entry_price = row[3]
-        position_size = row[6]
-        
-        if direction == 'LONG':
-            pnl = (exit_price - entry_price) * position_size
-        else:
-            pnl = (entry_price - exit_price) * position_size
-        
-        pnl_percent = (pnl / (entry_price * position_size)) * 100
-        
         exit_time = int(time.time())
-        
-        # Insert into trades
-        cursor.execute('''
-            INSERT INTO trades
-            (symbol, direction, entry_price, exit_price, stop_loss, target,
-             position_size, entry_time, exit_time, exit_reason, pnl, pnl_percent, setup_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (row[1], row[2], row[3], exit_price, row[4], row[5], row[6],
-              row[7], exit_time, exit_reason, pnl, pnl_percent, row[8]))
-        
-        # Delete from positions
-        cursor.execute('DELETE FROM positions WHERE id = ?', (position_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ Position closed: {row[1]} {direction} | P&L: ${pnl:.2f} ({pnl_percent:.2f}%)")
+
+        if _HAS_RETURNING:
+            # One INSERT ... SELECT computes the P&L in SQL and hands the
+            # values straight back via RETURNING - no SELECT round-trip
+            # over the same row first
+            with conn:
+                cursor.execute(SQL_CLOSE_POSITION_RETURNING,
+                               (exit_price, exit_time, exit_reason,
+                                exit_price, exit_price, position_id))
+                trade = cursor.fetchone()
+                if trade is not None:
+                    cursor.execute(SQL_DELETE_POSITION, (position_id,))
+
+            if trade is None:
+                return None
+            symbol, direction, entry_price, pnl, pnl_percent = trade
+        else:
+            # Older SQLite: read the position and compute the P&L here
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(SQL_SELECT_POSITION_BY_ID, (position_id,))
+            row = cursor.fetchone()
+
+            if not row:
+                return None
+
+            symbol = row['symbol']
+            direction = row['direction']
+            entry_price = row['entry_price']
+            position_size = row['position_size']
+
+            if direction == 'LONG':
+                pnl = (exit_price - entry_price) * position_size
+            else:
+                pnl = (entry_price - exit_price) * position_size
+
+            pnl_percent = (pnl / (entry_price * position_size)) * 100
+
+            # Insert into trades and delete the position in one commit, so
+            # the row can never exist in both tables on disk
+            with conn:
+                cursor.execute(SQL_INSERT_TRADE,
+                               (symbol, direction, entry_price, exit_price,
+                                row['stop_loss'], row['target'], position_size,
+                                row['entry_time'], exit_time, exit_reason, pnl,
+                                pnl_percent, row['setup_type']))
+                cursor.execute(SQL_DELETE_POSITION, (position_id,))
+
+        # A new trade row invalidates the cached aggregates
+        self._stats_cache = None
+        self._daily_pnl_cache = None
+
+        print(f"✅ Position closed: {symbol} {direction} | P&L: ${pnl:.2f} ({pnl_percent:.2f}%)")
         return {
-            'symbol': row[1],
+            'symbol': symbol,
             'direction': direction,
             'entry_price': entry_price,
             'exit_price': exit_price,
@@ -162,133 +349,85 @@ class PositionManager:
     
     def update_stop_loss(self, position_id, new_stop_loss):
         """Update trailing stop loss"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            UPDATE positions SET stop_loss = ? WHERE id = ?
-        ''', (new_stop_loss, position_id))
-        
-        conn.commit()
-        conn.close()
+        with conn:
+            cursor.execute(SQL_UPDATE_STOP_LOSS, (new_stop_loss, position_id))
         print(f"✅ Stop loss updated for position {position_id}: {new_stop_loss}")
     
     def get_open_positions(self, symbol=None):
         """Get all open positions, optionally filtered by symbol"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
+        # Row factory set on the cursor so the shared connection keeps
+        # returning plain tuples elsewhere
+        cursor.row_factory = sqlite3.Row
         
         if symbol:
-            cursor.execute('SELECT * FROM positions WHERE symbol = ? AND status = "OPEN"', (symbol,))
+            cursor.execute(SQL_OPEN_POSITIONS_BY_SYMBOL, (symbol,))
         else:
-            cursor.execute('SELECT * FROM positions WHERE status = "OPEN"')
+            cursor.execute(SQL_OPEN_POSITIONS)
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        positions = []
-        for row in rows:
-            positions.append({
-                'id': row['id'],
-                'symbol': row['symbol'],
-                'direction': row['direction'],
-                'entry_price': row['entry_price'],
-                'stop_loss': row['stop_loss'],
-                'target': row['target'],
-                'position_size': row['position_size'],
-                'entry_time': row['entry_time'],
-                'setup_type': row['setup_type']
-            })
-        
-        return positions
+        # dict(row) maps every selected column in C instead of rebuilding
+        # the dict key by key in Python
+        return [dict(row) for row in cursor.fetchall()]
     
     def count_open_positions(self):
         """Count total open positions"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM positions WHERE status = "OPEN"')
+        cursor.execute(SQL_COUNT_OPEN_POSITIONS)
         count = cursor.fetchone()[0]
-        conn.close()
         return count
     
     def get_recent_trades(self, limit=20):
         """Get recent closed trades"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
+        # Row factory set on the cursor so the shared connection keeps
+        # returning plain tuples elsewhere
+        cursor.row_factory = sqlite3.Row
         
-        cursor.execute('''
-            SELECT * FROM trades 
-            ORDER BY exit_time DESC 
-            LIMIT ?
-        ''', (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        cursor.execute(SQL_RECENT_TRADES, (limit,))
         
-        trades = []
-        for row in rows:
-            trades.append({
-                'id': row['id'],
-                'symbol': row['symbol'],
-                'direction': row['direction'],
-                'entry_price': row['entry_price'],
-                'exit_price': row['exit_price'],
-                'pnl': row['pnl'],
-                'pnl_percent': row['pnl_percent'],
-                'exit_reason': row['exit_reason'],
-                'entry_time': row['entry_time'],
-                'exit_time': row['exit_time'],
-                'setup_type': row['setup_type']
-            })
-        
-        return trades
+        return [dict(row) for row in cursor.fetchall()]
     
     def get_daily_pnl(self):
         """Calculate today's total P&L"""
-        conn = sqlite3.connect(self.db_path)
+        cached = self._daily_pnl_cache
+        if cached is not None and time.monotonic() - cached[0] < _STATS_TTL:
+            return cached[1]
+
+        conn = self._connect()
         cursor = conn.cursor()
         
-        today_start = int(datetime.now().replace(hour=0, minute=0, second=0).timestamp())
-        
-        cursor.execute('''
-            SELECT SUM(pnl) FROM trades 
-            WHERE exit_time >= ?
-        ''', (today_start,))
+        cursor.execute(SQL_DAILY_PNL, (_day_start(),))
         
         result = cursor.fetchone()[0]
-        conn.close()
-        
-        return result if result else 0
-    
+
+        daily_pnl = result if result else 0
+        self._daily_pnl_cache = (time.monotonic(), daily_pnl)
+        return daily_pnl
+
     def get_trading_stats(self):
         """Get trading statistics"""
-        conn = sqlite3.connect(self.db_path)
+        cached = self._stats_cache
+        if cached is not None and time.monotonic() - cached[0] < _STATS_TTL:
+            return cached[1]
+
+        conn = self._connect()
         cursor = conn.cursor()
-        
-        # Total trades
-        cursor.execute('SELECT COUNT(*) FROM trades')
-        total_trades = cursor.fetchone()[0]
-        
-        # Winning trades
-        cursor.execute('SELECT COUNT(*) FROM trades WHERE pnl > 0')
-        winning_trades = cursor.fetchone()[0]
-        
-        # Total P&L
-        cursor.execute('SELECT SUM(pnl) FROM trades')
-        total_pnl = cursor.fetchone()[0] or 0
-        
-        # Average P&L
-        cursor.execute('SELECT AVG(pnl) FROM trades')
-        avg_pnl = cursor.fetchone()[0] or 0
-        
+
+        # One pass over the pnl column computes everything at once
+        # instead of four separate scans
+        cursor.execute(SQL_TRADING_STATS)
+        total_trades, winning_trades, total_pnl, avg_pnl = cursor.fetchone()
+
         # Win rate
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-        
-        conn.close()
-        
-        return {
+
+        stats = {
             'total_trades': total_trades,
             'winning_trades': winning_trades,
             'losing_trades': total_trades - winning_trades,
@@ -296,24 +435,75 @@ class PositionManager:
             'total_pnl': round(total_pnl, 2),
             'avg_pnl': round(avg_pnl, 2)
         }
+        self._stats_cache = (time.monotonic(), stats)
+        return stats
     
     def log_signal(self, symbol, signal_type, direction, master_score, details):
-        """Log a trading signal"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """Queue a trading signal for the writer thread (non-blocking)"""
+        self._signal_q.put_nowait(
+            (symbol, signal_type, direction, master_score, details)
+        )
+
+    def flush_signals(self):
+        """Block until all queued signals have been written"""
+        self._signal_q.join()
+
+    def _signal_writer_loop(self):
+        """Drain queued signals, writing each burst as one batch"""
+        while True:
+            batch = [self._signal_q.get()]
+            # Linger briefly so a burst of alerts shares one transaction
+            deadline = time.monotonic() + 0.5
+            while len(batch) < 500:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._signal_q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Broad catch: any escape here would kill the daemon thread
+            # and silently drop every later signal (and serialization
+            # errors surface on this thread, not the caller's)
+            try:
+                self.log_signals_batch(batch)
+            except Exception:
+                logger.exception("  ❌ Error in signal writer")
+            finally:
+                for _ in batch:
+                    self._signal_q.task_done()
+
+    def log_signals_batch(self, signals):
+        """Log several signals in one transaction (one fsync for all)
+        signals: iterable of (symbol, signal_type, direction,
+                              master_score, details) tuples
+        """
         timestamp = int(time.time())
-        details_json = json.dumps(details)
-        
-        cursor.execute('''
-            INSERT INTO signals
-            (symbol, signal_type, direction, master_score, timestamp, details)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (symbol, signal_type, direction, master_score, timestamp, details_json))
-        
-        conn.commit()
-        conn.close()
-    
+        # Callers that already hold a JSON string pass through untouched
+        rows = [
+            (symbol, signal_type, direction, master_score, timestamp,
+             details if isinstance(details, str) else _dumps(details))
+            for symbol, signal_type, direction, master_score, details in signals
+        ]
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(SQL_LOG_SIGNAL, rows)
+
+    def analyze(self):
+        """Refresh the query-planner statistics for all three tables
+
+        Cheap on tables this size; the background worker calls it hourly
+        so index selectivity estimates track the growing trades/signals
+        tables instead of the stats from whenever the db was created.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute('ANALYZE positions')
+            conn.execute('ANALYZE trades')
+            conn.execute('ANALYZE signals')
+
     def check_daily_loss_limit(self, account_balance, limit_percent=4):
         """Check if daily loss limit is reached"""
         daily_pnl = self.get_daily_pnl()
@@ -326,17 +516,13 @@ class PositionManager:
     
     def count_trades_last_hour(self):
         """Count trades in the last hour"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         one_hour_ago = int(time.time()) - 3600
         
-        cursor.execute('''
-            SELECT COUNT(*) FROM trades 
-            WHERE entry_time >= ?
-        ''', (one_hour_ago,))
+        cursor.execute(SQL_COUNT_TRADES_SINCE, (one_hour_ago,))
         
         count = cursor.fetchone()[0]
-        conn.close()
         
         return count
@@ -0,0 +1,52 @@
+# ============================================
+# backend/profile_hot.py
+# cProfile harness for the hot update path
+# ============================================
+"""
+Run one full update cycle under cProfile and print the top cumulative
+costs, so indicator / JSON / SQLite work can be compared before and
+after a change.
+
+Usage:
+    python profile_hot.py [--config ../settings.json]
+
+The stats are also dumped to profile_hot.pstats for snakeviz:
+    snakeviz profile_hot.pstats
+
+For a flamegraph of the live server instead:
+    py-spy record -o profile.svg -- python server_app.py
+"""
+import cProfile
+import pstats
+
+from config_loader import load_configuration
+from data_processor import DataProcessor
+from db_manager import init_db
+
+class _NullSocket:
+    """Stands in for SocketIO so emits are free during profiling"""
+
+    def emit(self, *args, **kwargs):
+        pass
+
+def main():
+    settings, _account_balance, _config_file = load_configuration()
+
+    for symbol in settings['symbols']:
+        init_db(symbol, settings['intervals'])
+
+    processor = DataProcessor(settings, _NullSocket())
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    for symbol in settings['symbols']:
+        processor.update_symbol_data(symbol)
+    processor.flush_writes()
+
+    profiler.disable()
+    profiler.dump_stats('profile_hot.pstats')
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(30)
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,14 @@
 from flask import Flask
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 import threading
+import time
 import os
 import sys
 
 # Import modules
+from _indicator_kernels import warmup as warmup_kernels
+from _logging import configure as configure_logging
 from config_loader import load_configuration, run_preflight_checks
 from db_manager import init_db
 from trading_engine import TradingEngine
@@ -16,9 +19,52 @@ from data_processor import DataProcessor
 from background_worker import BackgroundWorker
 from api_routes import register_routes
 
+# orjson on the wire: python-socketio accepts any module-like object
+# with dumps/loads for packet encoding, and Flask 2.2+ takes a JSON
+# provider for jsonify. Both fall back to stdlib behaviour when orjson
+# is not installed (same pattern as api_routes/db_manager).
+try:
+    import orjson
+
+    class _wire_json:
+        @staticmethod
+        def dumps(obj, **kwargs):
+            # OPT_SERIALIZE_NUMPY walks NumPy scalars in the score
+            # payloads directly instead of raising TypeError
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    _HAS_ORJSON = True
+except ImportError:
+    import json as _wire_json
+    _HAS_ORJSON = False
+
+def _install_json_provider(app):
+    """Route jsonify through orjson where Flask and orjson allow it"""
+    if not _HAS_ORJSON:
+        return
+    try:
+        from flask.json.provider import DefaultJSONProvider
+    except ImportError:
+        return
+
+    class _OrjsonProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return _wire_json.dumps(obj)
+
+        def loads(self, s, **kwargs):
+            return _wire_json.loads(s)
+
+    app.json = _OrjsonProvider(app)
+
 def main():
     """Main application entry point"""
-    
+
+    configure_logging()
+
     # Load configuration
     settings, account_balance, config_file = load_configuration()
     settings['account_balance'] = account_balance
@@ -29,13 +75,23 @@ def main():
     # Initialize Flask app
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": "*"}})
-    
+    _install_json_provider(app)
+
+    # Explicitly no per-frame logging: engineio logs every ping/pong
+    # when enabled, which is a synchronous stderr write per message.
+    # async_mode stays 'threading' by default (the worker, writer and
+    # notification threads rely on real OS threads); deployments that
+    # install eventlet/gevent and monkey-patch before startup can opt in
+    # via PYREACT_ASYNC_MODE
     socketio = SocketIO(
         app,
         cors_allowed_origins="*",
-        async_mode='threading',
+        async_mode=os.environ.get('PYREACT_ASYNC_MODE', 'threading'),
+        logger=False,
+        engineio_logger=False,
         ping_timeout=60,
-        ping_interval=25
+        ping_interval=25,
+        json=_wire_json
     )
     
     # Initialize components
@@ -43,6 +99,10 @@ def main():
     print("🗄️  Initializing components...")
     print(f"{'='*60}")
     
+    # Compile the indicator kernels now rather than stalling the first
+    # update cycle on JIT compilation
+    warmup_kernels()
+
     trading_engine = TradingEngine(settings)
     position_manager = PositionManager()
     notification_handler = NotificationHandler(settings)
@@ -60,12 +120,18 @@ def main():
         print(f"  ✅ {symbol}: db/{symbol}.sqlite")
     
     # Register API routes
-    register_routes(app, settings, position_manager)
+    register_routes(app, settings, position_manager, background_worker)
     
     # WebSocket events
     @socketio.on('connect')
     def handle_connect():
         print('🔌 Client connected')
+        # Diff-broadcasting skips unchanged cycles, so push the current
+        # snapshot unconditionally to the connecting client
+        snapshot = data_processor.latest_payloads()
+        if snapshot:
+            emit('score_updates_batch',
+                 {'updates': snapshot, 'ts': int(time.time())})
     
     @socketio.on('disconnect')
     def handle_disconnect():
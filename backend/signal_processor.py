@@ -1,16 +1,33 @@
 from datetime import datetime
 import time
 
+from _logging import get_logger
+
+logger = get_logger(__name__)
+
+# Minimum seconds between repeated setup alerts for the same
+# (symbol, setup type, direction)
+ALERT_COOLDOWN = 900
+
 class SignalProcessor:
     """Process trading signals and notifications"""
-    
-    def __init__(self, settings, trading_engine, position_manager, 
+
+    def __init__(self, settings, trading_engine, position_manager,
                  notification_handler):
         self.settings = settings
         self.trading_engine = trading_engine
         self.position_manager = position_manager
         self.notification_handler = notification_handler
         self.adx_history = {}
+        self.last_alert_time = {}
+
+    def _should_fire(self, key, now):
+        """Consult and update the alert cooldown in one dict operation"""
+        last = self.last_alert_time.get(key)
+        if last is not None and now - last < ALERT_COOLDOWN:
+            return False
+        self.last_alert_time[key] = now
+        return True
     
     def process_trading_signals(self, symbol, master_score, weighted_indicators, 
                                interval_scores, current_price):
@@ -43,7 +60,7 @@ class SignalProcessor:
         )
         
         if not can_trade:
-            print(f"  🚫 Market filter: {filter_reason}")
+            logger.debug("  🚫 Market filter: %s", filter_reason)
             return
         
         # Manage existing positions
@@ -55,7 +72,7 @@ class SignalProcessor:
             return
         
         if not self.trading_engine.check_cooldown(symbol):
-            print(f"  ⏱️  Cooldown active for {symbol}")
+            logger.debug("  ⏱️  Cooldown active for %s", symbol)
             return
         
         # Detect and process signals
@@ -109,28 +126,31 @@ class SignalProcessor:
                                    high_volume, interval_scores, swing_low, 
                                    swing_high, atr, interval_1h):
         """Detect reversal/breakout and process entry signals"""
-        
+        now = time.time()
+
         # Detect reversal
         is_reversal, reversal_direction = self.trading_engine.detect_reversal_setup(
             master_score, weighted_rsi, rsi_extreme, current_price,
             support, resistance, weighted_adx
         )
-        
-        if is_reversal:
-            self.notification_handler.send_setup_alert(
-                symbol, reversal_direction, 'Reversal', master_score
-            )
-        
+
         # Detect breakout
         is_breakout, breakout_direction = self.trading_engine.detect_breakout_setup(
             master_score, weighted_rsi, current_price, support, resistance,
             weighted_adx, self.adx_history.get(symbol, [])
         )
-        
-        if is_breakout:
-            self.notification_handler.send_setup_alert(
-                symbol, breakout_direction, 'Breakout', master_score
-            )
+
+        # One table-driven pass shares the cooldown/alert plumbing; a
+        # forming setup persists across cycles, and the cooldown keeps it
+        # from re-alerting every tick
+        for setup_type, detected, direction in (
+            ('Reversal', is_reversal, reversal_direction),
+            ('Breakout', is_breakout, breakout_direction),
+        ):
+            if detected and self._should_fire((symbol, setup_type, direction), now):
+                self.notification_handler.send_setup_alert(
+                    symbol, direction, setup_type, master_score
+                )
         
         # Check entry conditions
         supertrend_scores = {
@@ -199,7 +219,7 @@ class SignalProcessor:
                      master_score, weighted_rsi, swing_low, swing_high, 
                      atr, interval_1h):
         """Execute entry signal"""
-        print(f"\n  🚀 ENTRY SIGNAL: {direction} {setup_type}")
+        logger.info("\n  🚀 ENTRY SIGNAL: %s %s", direction, setup_type)
         
         supertrend_1h = interval_1h.get('supertrend_score', 50)
         
@@ -215,9 +235,9 @@ class SignalProcessor:
             self.settings['account_balance'], entry_price, stop_loss
         )
         
-        print(f"  💰 Entry: ${entry_price:.2f}")
-        print(f"  🛑 Stop Loss: ${stop_loss:.2f}")
-        print(f"  🎯 Target: ${target:.2f}")
+        logger.info("  💰 Entry: $%.2f", entry_price)
+        logger.info("  🛑 Stop Loss: $%.2f", stop_loss)
+        logger.info("  🎯 Target: $%.2f", target)
         
         position_id = self.position_manager.open_position(
             symbol, direction, entry_price, stop_loss, target,
@@ -239,7 +259,7 @@ class SignalProcessor:
         )
         
         if limit_reached:
-            print(f"  🛑 Daily loss limit reached: ${daily_pnl:.2f}")
+            logger.info("  🛑 Daily loss limit reached: $%.2f", daily_pnl)
             self.notification_handler.send_risk_warning(
                 'DAILY_LOSS_LIMIT', {'daily_pnl': daily_pnl, 'limit_percent': 4}
             )
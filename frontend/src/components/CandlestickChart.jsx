@@ -41,9 +41,11 @@ export default function CandlestickChart({ symbol, intervals }) {
       setLoading(true);
       
       const candlesResponse = await axios.get(`${API_URL}/candles/${symbol}/${selectedInterval}?limit=100`);
-      const candleData = candlesResponse.data.map(c => ({
-        x: new Date(c.timestamp * 1000).getTime(),
-        y: [c.open, c.high, c.low, c.close]
+      // The endpoint serves columnar arrays: one array per OHLCV field
+      const cols = candlesResponse.data.candles;
+      const candleData = cols.timestamp.map((t, i) => ({
+        x: new Date(t * 1000).getTime(),
+        y: [cols.open[i], cols.high[i], cols.low[i], cols.close[i]]
       }));
       setCandles(candleData);
 
@@ -85,6 +85,16 @@ class WebSocketService {
       this.listeners.score_update.forEach(cb => cb(data));
     });
 
+    // The backend batches one frame per update cycle; fan the entries
+    // out to the existing score_update listeners
+    this.socket.on('score_updates_batch', (payload) => {
+      const updates = payload.updates || payload;
+      console.log('📊 Score updates batch received:', updates.length);
+      updates.forEach(data => {
+        this.listeners.score_update.forEach(cb => cb(data));
+      });
+    });
+
     this.socket.on('alert', (data) => {
       console.log('🔔 Alert received:', data.type, 'for', data.symbol);
       this.listeners.alert.forEach(cb => cb(data));